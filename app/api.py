@@ -1,14 +1,26 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List, Set, Tuple
+import asyncio
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 from fastapi.middleware.cors import CORSMiddleware
 
-from .data_loader import get_latest_df
-from .model import RegimeHMM
-from .strategies import generate_signal
+from .data_loader import SYMBOL, get_latest_df
+from .model import RegimeHMM, model_cache_key
+from .snapshots import SnapshotStore, get_snapshot_store
+from .strategies import IndicatorState, aggregate_regime_probs
+from .selection import MODEL_SELECTION, fit_selected_model, model_labels
 from .backtest import run_backtest
+from .refresh import compute_snapshot
+from .http_cache import ResponseCache, cache_headers, etag_matches, is_not_modified, make_etag
+from .history import normalize_date, page_timeline, regime_timeline
+from .artifacts import ARTIFACT_DIR, ArtifactReader
 
 app = FastAPI(title="Regime-Switching Trading Engine", version="1.0.0")
 
@@ -19,11 +31,54 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Cache-Control"],
 )
 
 # Global model instance
 hmm_model: Optional[RegimeHMM] = None
 
+# Models for symbols other than the default one, fitted on first batch request (LRU-bounded)
+symbol_models = ResponseCache(maxsize=int(os.getenv('MAX_SYMBOL_MODELS', '32')))
+
+# One lock per symbol being fitted, so concurrent requests for a cold symbol fit its model once
+model_locks: Dict[str, threading.Lock] = {}
+model_locks_guard = threading.Lock()
+
+# Symbols besides the default one this worker has agreed to load, capped so that without an
+# ALLOWED_SYMBOLS allowlist anonymous callers cannot make it fetch, cache and fit without limit
+MAX_COLD_SYMBOLS = int(os.getenv('MAX_COLD_SYMBOLS', '64'))
+cold_symbols: Set[str] = set()
+cold_symbols_guard = threading.Lock()
+
+# Cold symbols whose last fetch returned no data, with the time of that fetch; retried after the TTL
+MISSING_SYMBOL_TTL = float(os.getenv('MISSING_SYMBOL_TTL', '900'))
+missing_symbols = ResponseCache(maxsize=MAX_COLD_SYMBOLS)
+
+# Upper bound on symbols per batch request, and worker threads used to evaluate them
+MAX_BATCH_SYMBOLS = int(os.getenv('MAX_BATCH_SYMBOLS', '50'))
+
+# Accepted symbols: ticker syntax (SPY, BRK-B, ^GSPC, ES=F), optionally restricted to an allowlist
+SYMBOL_PATTERN = re.compile(r'^[A-Z0-9^][A-Z0-9.=^-]{0,14}$')
+ALLOWED_SYMBOLS = {s.strip().upper() for s in os.getenv('ALLOWED_SYMBOLS', '').split(',') if s.strip()}
+batch_executor = ThreadPoolExecutor(max_workers=int(os.getenv('BATCH_WORKERS', '8')))
+
+# Published read-only model/data per symbol when running as a production worker (ARTIFACT_DIR set)
+artifact_readers: Dict[str, ArtifactReader] = {}
+
+# Streaming indicator state per symbol, advanced by new bars only
+indicator_states: Dict[str, IndicatorState] = {}
+
+# Global snapshot store (None when snapshots are disabled)
+snapshot_store: Optional[SnapshotStore] = None
+
+# In-process cache of response bodies keyed by ETag
+response_cache = ResponseCache()
+
+# Decoded regime timelines keyed by data and model version, and page size bounds
+history_cache = ResponseCache(maxsize=int(os.getenv('HISTORY_CACHE_SIZE', '8')))
+HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', '500'))
+MAX_HISTORY_PAGE_SIZE = int(os.getenv('MAX_HISTORY_PAGE_SIZE', '5000'))
+
 class RegimeResponse(BaseModel):
     """Response model for regime probabilities."""
     bull_probability: float
@@ -47,27 +102,318 @@ class BacktestResponse(BaseModel):
     benchmark_cumulative: list[float]
     dates: list[str]
 
-def get_or_create_model() -> RegimeHMM:
+class RegimePoint(BaseModel):
+    """Most likely regime and smoothed probabilities on one date."""
+    date: str
+    state: int
+    label: str
+    probabilities: list[float]
+
+class RegimeSegment(BaseModel):
+    """Run of consecutive dates in one regime."""
+    start: str
+    end: str
+    state: int
+    label: str
+    days: int
+
+class RegimeHistoryResponse(BaseModel):
+    """Response model for one page of the regime timeline."""
+    symbol: str
+    model_version: str
+    points: list[RegimePoint]
+    segments: list[RegimeSegment]
+    next_cursor: Optional[str]
+
+class BatchRegimeResponse(BaseModel):
+    """Response model for multi-symbol regime probabilities."""
+    results: Dict[str, RegimeResponse]
+    errors: Dict[str, str]
+
+class BatchSignalResponse(BaseModel):
+    """Response model for multi-symbol trading signals."""
+    results: Dict[str, SignalResponse]
+    errors: Dict[str, str]
+
+def get_or_create_model(symbol: str = SYMBOL, df: Optional[pd.DataFrame] = None) -> RegimeHMM:
     """
-    Get or create the HMM model instance.
+    Get or create the HMM model instance for a symbol.
+    Args:
+        symbol (str): Ticker symbol; the default symbol uses the global model.
+        df (Optional[pd.DataFrame]): Already-loaded data to fit on, if any.
     Returns:
         RegimeHMM: Fitted HMM model.
     """
     global hmm_model
-    
-    if hmm_model is None:
-        # Load data and fit model
-        df = get_latest_df()
-        if df.empty:
-            raise HTTPException(status_code=500, detail="No data available")
-        
-        hmm_model = RegimeHMM(n_states=3)
-        try:
-            hmm_model.fit(df)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Model fitting failed: {str(e)}")
-    
-    return hmm_model
+
+    model = hmm_model if symbol == SYMBOL else symbol_models.get(symbol)
+    if model is not None:
+        return model
+
+    with model_locks_guard:
+        lock = model_locks.setdefault(symbol, threading.Lock())
+    try:
+        with lock:
+            # Another request may have fitted the model while this one waited.
+            model = hmm_model if symbol == SYMBOL else symbol_models.get(symbol)
+            if model is not None:
+                return model
+
+            # Load data and fit model
+            if df is None:
+                df = get_latest_df(symbol=symbol)
+            if df.empty:
+                raise HTTPException(status_code=500, detail="No data available")
+
+            if MODEL_SELECTION:
+                try:
+                    model = fit_selected_model(df, symbol)
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=f"Model selection failed: {str(e)}")
+            else:
+                model = RegimeHMM(n_states=3)
+                key = model_cache_key(symbol, df)
+                if not model.load_cached(key):
+                    try:
+                        model.fit(df)
+                    except Exception as e:
+                        raise HTTPException(status_code=500, detail=f"Model fitting failed: {str(e)}")
+                    model.save_cached(key)
+
+            if symbol == SYMBOL:
+                hmm_model = model
+            else:
+                symbol_models.put(symbol, model)
+    finally:
+        # Locks only live while a fit is pending, so the dict stays bounded by concurrent requests.
+        with model_locks_guard:
+            if model_locks.get(symbol) is lock and not lock.locked():
+                del model_locks[symbol]
+
+    return model
+
+def admit_symbol(symbol: str) -> None:
+    """
+    Check that this worker may load a symbol, counting it against MAX_COLD_SYMBOLS on first use.
+    Args:
+        symbol (str): Ticker symbol.
+    """
+    if symbol == SYMBOL or symbol in ALLOWED_SYMBOLS:
+        return
+    with cold_symbols_guard:
+        if symbol not in cold_symbols:
+            if len(cold_symbols) >= MAX_COLD_SYMBOLS:
+                raise HTTPException(status_code=429, detail=f"Symbol limit reached; not loading {symbol}")
+            cold_symbols.add(symbol)
+    missing_since = missing_symbols.get(symbol)
+    if missing_since is not None and time.monotonic() - missing_since < MISSING_SYMBOL_TTL:
+        raise HTTPException(status_code=404, detail=f"No data available for {symbol}")
+
+def get_serving_state(symbol: str = SYMBOL) -> Tuple[RegimeHMM, pd.DataFrame]:
+    """
+    Get the model and data to serve a symbol from.
+    Production workers use the supervisor's published artifacts, so model and
+    data always come from the same version and no worker runs an EM fit;
+    otherwise the data is loaded and the model fitted on first use.
+    Args:
+        symbol (str): Ticker symbol.
+    Returns:
+        Tuple[RegimeHMM, pd.DataFrame]: Fitted model and its OHLCV history.
+    """
+    admit_symbol(symbol)
+    if ARTIFACT_DIR:
+        reader = artifact_readers.get(symbol)
+        if reader is None:
+            reader = artifact_readers.setdefault(symbol, ArtifactReader(symbol))
+        artifacts = reader.current()
+        if artifacts is None:
+            raise HTTPException(status_code=500, detail=f"No published model for {symbol}")
+        return artifacts.model, artifacts.df
+
+    df = get_latest_df(symbol=symbol)
+    if df.empty:
+        if symbol in cold_symbols:
+            missing_symbols.put(symbol, time.monotonic())
+        raise HTTPException(status_code=500, detail="No data available")
+    return get_or_create_model(symbol, df), df
+
+def get_indicator_state(df: pd.DataFrame, symbol: str = SYMBOL) -> IndicatorState:
+    """
+    Get the symbol's indicator state advanced to the last bar of df.
+    Args:
+        df (pd.DataFrame): Latest OHLCV data.
+        symbol (str): Ticker symbol.
+    Returns:
+        IndicatorState: State whose last bar is df's last bar.
+    """
+    state = indicator_states.get(symbol)
+    if state is None or not state.follows(df):
+        state = IndicatorState.from_df(df)
+        indicator_states[symbol] = state
+    else:
+        state.catch_up(df)
+    return state
+
+def get_snapshot(symbol: str = SYMBOL) -> Optional[Dict[str, Any]]:
+    """
+    Get the precomputed snapshot for a symbol, if the refresh job wrote one.
+    Args:
+        symbol (str): Ticker symbol.
+    Returns:
+        Optional[Dict[str, Any]]: Snapshot item, or None to fall back to live computation.
+    """
+    global snapshot_store
+
+    try:
+        if snapshot_store is None:
+            snapshot_store = get_snapshot_store()
+        if snapshot_store is None:
+            return None
+        return snapshot_store.get_item(symbol)
+    except Exception as e:
+        print(f"[snapshot] Lookup failed for {symbol}: {e}")
+        return None
+
+def conditional_response(request: Request, response: Response, etag: str,
+                         timestamp: Any, compute: Callable[[], Any], model_dependent: bool = False) -> Any:
+    """
+    Serve a response keyed to the latest bar, honouring conditional requests.
+    Args:
+        request (Request): Incoming request.
+        response (Response): Response whose headers are set on success.
+        etag (str): ETag derived from the data and model versions.
+        timestamp: Last bar timestamp, used for Last-Modified.
+        compute (Callable[[], Any]): Builds the body on a cache miss.
+        model_dependent (bool): The body depends on the model, so only the ETag validates.
+    Returns:
+        Any: A 304 response, a cached body, or a freshly computed body.
+    """
+    headers = cache_headers(etag, timestamp)
+    if is_not_modified(request, etag, timestamp, model_dependent=model_dependent):
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(etag)
+    if body is None:
+        body = compute()
+        response_cache.put(etag, body)
+    response.headers.update(headers)
+    return body
+
+def latest_validator(symbol: str = SYMBOL) -> Tuple[Any, Optional[str]]:
+    """
+    Get what a conditional request is validated against, without loading or fitting a model.
+    Args:
+        symbol (str): Ticker symbol.
+    Returns:
+        Tuple[Any, Optional[str]]: Last bar timestamp, and the version of the model this
+        worker already serves (None on a cold worker).
+    """
+    if ARTIFACT_DIR:
+        # Attaching published artifacts maps files and runs no EM, so it is cheap.
+        model, df = get_serving_state(symbol)
+        return df.index[-1], model.version()
+    last = get_latest_df(symbol=symbol, columns=['Close'], tail=1)
+    if last.empty:
+        raise HTTPException(status_code=500, detail="No data available")
+    model = hmm_model if symbol == SYMBOL else symbol_models.get(symbol)
+    return last.index[-1], model.version() if model is not None else None
+
+def not_modified_response(request: Request, kind: str, *params: Any) -> Optional[Response]:
+    """
+    Answer a matching conditional request with 304 before the model is touched.
+    On a cold worker only the data part of the ETag can be compared; the model
+    fitted for the same data is deterministic, so a data match is still fresh.
+    Args:
+        request (Request): Incoming request.
+        kind (str): Endpoint name used in the ETag.
+        *params: Request parameters used in the ETag.
+    Returns:
+        Optional[Response]: A 304 response, or None to serve the body.
+    """
+    if request.headers.get('if-none-match') is None:
+        return None
+    last_bar, model_version = latest_validator()
+    etag = make_etag(kind, SYMBOL, last_bar, *params, model_version=model_version)
+    if not is_not_modified(request, etag, last_bar, model_dependent=True):
+        return None
+    if model_version is None:
+        # Echo the client's full tag so its cached validator keeps the model part.
+        tags = [tag.strip() for tag in request.headers['if-none-match'].split(',')]
+        etag = next((tag.removeprefix('W/') for tag in tags if etag_matches(tag, etag)), etag)
+    return Response(status_code=304, headers=cache_headers(etag, last_bar))
+
+def parse_symbols(symbols: List[str]) -> List[str]:
+    """
+    Normalise ``?symbols=SPY,QQQ`` / repeated ``?symbols=`` query values.
+    Args:
+        symbols (List[str]): Raw query values.
+    Returns:
+        List[str]: Unique upper-case symbols in request order.
+    """
+    parsed: List[str] = []
+    for value in symbols:
+        for symbol in value.split(','):
+            symbol = symbol.strip().upper()
+            if not symbol or symbol in parsed:
+                continue
+            # Every accepted symbol can cost a data fetch, a cache file and a model fit.
+            if not SYMBOL_PATTERN.match(symbol):
+                raise HTTPException(status_code=400, detail=f"Invalid symbol: {symbol[:20]}")
+            if ALLOWED_SYMBOLS and symbol not in ALLOWED_SYMBOLS:
+                raise HTTPException(status_code=400, detail=f"Symbol not allowed: {symbol}")
+            parsed.append(symbol)
+            if len(parsed) > MAX_BATCH_SYMBOLS:
+                raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SYMBOLS} symbols per request")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="No symbols given")
+    return parsed
+
+def evaluate_symbol(symbol: str) -> Dict[str, Any]:
+    """
+    Load data and model for one symbol and compute its latest regime and signal.
+    Args:
+        symbol (str): Ticker symbol.
+    Returns:
+        Dict[str, Any]: Snapshot-shaped result.
+    """
+    model, df = get_serving_state(symbol)
+    return compute_snapshot(symbol, df, model)
+
+async def evaluate_batch(symbols: List[str]) -> tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """
+    Evaluate many symbols in one pass: stored snapshots are read in a single
+    batch lookup, and the rest are computed in parallel on the batch executor.
+    Args:
+        symbols (List[str]): Symbols to evaluate.
+    Returns:
+        tuple: Per-symbol snapshot results and per-symbol error messages.
+    """
+    global snapshot_store
+
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+
+    try:
+        if snapshot_store is None:
+            snapshot_store = get_snapshot_store()
+        if snapshot_store is not None:
+            results.update(snapshot_store.batch_get_items(symbols))
+    except Exception as e:
+        print(f"[snapshot] Batch lookup failed: {e}")
+
+    pending = [symbol for symbol in symbols if symbol not in results]
+    loop = asyncio.get_running_loop()
+    outcomes = await asyncio.gather(
+        *(loop.run_in_executor(batch_executor, evaluate_symbol, symbol) for symbol in pending),
+        return_exceptions=True
+    )
+    for symbol, outcome in zip(pending, outcomes):
+        if isinstance(outcome, BaseException):
+            errors[symbol] = outcome.detail if isinstance(outcome, HTTPException) else str(outcome)
+        else:
+            results[symbol] = outcome
+    ordered = {symbol: results[symbol] for symbol in symbols if symbol in results}
+    return ordered, errors
 
 @app.get("/health")
 async def health_check() -> Dict[str, str]:
@@ -79,66 +425,145 @@ async def health_check() -> Dict[str, str]:
     return {"status": "ok"}
 
 @app.get("/regime/latest", response_model=RegimeResponse)
-async def get_latest_regime() -> RegimeResponse:
+async def get_latest_regime(request: Request, response: Response) -> RegimeResponse:
     """
     Get latest regime probabilities.
     Returns:
         RegimeResponse: Current regime probabilities.
     """
     try:
-        model = get_or_create_model()
-        df = get_latest_df()
-        
-        if df.empty:
-            raise HTTPException(status_code=500, detail="No data available")
-        
-        # Use last 30 days for prediction
-        tail_df = df.tail(30)
-        probs = model.predict_proba(tail_df)
-        
-        return RegimeResponse(
-            bull_probability=float(probs[0]),
-            bear_probability=float(probs[1]),
-            sideways_probability=float(probs[2]),
-            timestamp=str(df.index[-1])
-        )
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            def from_snapshot() -> RegimeResponse:
+                probs = snapshot["regime_probs"]
+                return RegimeResponse(
+                    bull_probability=float(probs[0]),
+                    bear_probability=float(probs[1]),
+                    sideways_probability=float(probs[2]),
+                    timestamp=snapshot["timestamp"]
+                )
+
+            etag = make_etag("regime", SYMBOL, snapshot["timestamp"], model_version=snapshot.get("model_version"))
+            return conditional_response(request, response, etag, snapshot["timestamp"], from_snapshot,
+                                        model_dependent=True)
+
+        not_modified = not_modified_response(request, "regime")
+        if not_modified is not None:
+            return not_modified
+        model, df = get_serving_state()
+
+        def compute() -> RegimeResponse:
+            # Use last 30 days for prediction
+            tail_df = df.tail(30)
+            probs = aggregate_regime_probs(model.predict_proba(tail_df), model_labels(model))
+            
+            return RegimeResponse(
+                bull_probability=float(probs[0]),
+                bear_probability=float(probs[1]),
+                sideways_probability=float(probs[2]),
+                timestamp=str(df.index[-1])
+            )
+
+        etag = make_etag("regime", SYMBOL, df.index[-1], model_version=model.version())
+        return conditional_response(request, response, etag, df.index[-1], compute, model_dependent=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/signal/latest", response_model=SignalResponse)
-async def get_latest_signal() -> SignalResponse:
+async def get_latest_signal(request: Request, response: Response) -> SignalResponse:
     """
     Get latest trading signal.
     Returns:
         SignalResponse: Current trading signal.
     """
     try:
-        model = get_or_create_model()
-        df = get_latest_df()
-        
-        if df.empty:
-            raise HTTPException(status_code=500, detail="No data available")
-        
-        # Use last 30 days for prediction
-        tail_df = df.tail(30)
-        probs = model.predict_proba(tail_df)
-        
-        # Generate signal using last 200 days for strategy calculation
-        strategy_df = df.tail(200)
-        signal_data = generate_signal(probs, strategy_df)
-        
-        return SignalResponse(
-            action=signal_data["action"],
-            confidence=signal_data["confidence"],
-            regime_probs=signal_data["regime_probs"],
-            weighted_signal=signal_data["weighted_signal"],
-            timestamp=str(df.index[-1])
-        )
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            def from_snapshot() -> SignalResponse:
+                signal_data = snapshot["signal"]
+                return SignalResponse(
+                    action=signal_data["action"],
+                    confidence=signal_data["confidence"],
+                    regime_probs=signal_data["regime_probs"],
+                    weighted_signal=signal_data["weighted_signal"],
+                    timestamp=snapshot["timestamp"]
+                )
+
+            etag = make_etag("signal", SYMBOL, snapshot["timestamp"], model_version=snapshot.get("model_version"))
+            return conditional_response(request, response, etag, snapshot["timestamp"], from_snapshot,
+                                        model_dependent=True)
+
+        not_modified = not_modified_response(request, "signal")
+        if not_modified is not None:
+            return not_modified
+        model, df = get_serving_state()
+
+        def compute() -> SignalResponse:
+            # Use last 30 days for prediction
+            tail_df = df.tail(30)
+            probs = aggregate_regime_probs(model.predict_proba(tail_df), model_labels(model))
+            
+            # Strategy indicators are advanced incrementally instead of recomputed over 200 days
+            signal_data = get_indicator_state(df).signal(probs)
+            
+            return SignalResponse(
+                action=signal_data["action"],
+                confidence=signal_data["confidence"],
+                regime_probs=signal_data["regime_probs"],
+                weighted_signal=signal_data["weighted_signal"],
+                timestamp=str(df.index[-1])
+            )
+
+        etag = make_etag("signal", SYMBOL, df.index[-1], model_version=model.version())
+        return conditional_response(request, response, etag, df.index[-1], compute, model_dependent=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/regime/history", response_model=RegimeHistoryResponse)
+async def get_regime_history(request: Request, response: Response,
+                             start: Optional[str] = None, end: Optional[str] = None,
+                             cursor: Optional[str] = None,
+                             limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE)
+                             ) -> RegimeHistoryResponse:
+    """
+    Get the decoded regime timeline of the current model.
+    Args:
+        start (Optional[str]): First date to include.
+        end (Optional[str]): Last date to include.
+        cursor (Optional[str]): next_cursor of the previous page.
+        limit (int): Maximum points per page.
+    Returns:
+        RegimeHistoryResponse: Points, segments and the cursor of the next page.
+    """
+    try:
+        start, end, cursor = normalize_date(start), normalize_date(end), normalize_date(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {e}")
+
+    try:
+        not_modified = not_modified_response(request, "history", start, end, cursor, limit)
+        if not_modified is not None:
+            return not_modified
+        model, df = get_serving_state()
+        version = model.version()
+
+        def compute() -> RegimeHistoryResponse:
+            # One decode per data and model version; pages are sliced from it.
+            key = make_etag("history", SYMBOL, df.index[-1], version)
+            timeline = history_cache.get(key)
+            if timeline is None:
+                timeline = regime_timeline(df, model, model_labels(model))
+                history_cache.put(key, timeline)
+            page = page_timeline(timeline, start=start, end=end, cursor=cursor, limit=limit)
+            return RegimeHistoryResponse(symbol=SYMBOL, model_version=version, **page)
+
+        etag = make_etag("history", SYMBOL, df.index[-1], start, end, cursor, limit, model_version=version)
+        return conditional_response(request, response, etag, df.index[-1], compute, model_dependent=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/backtest", response_model=BacktestResponse)
-async def get_backtest_results(years: int = 10) -> BacktestResponse:
+async def get_backtest_results(request: Request, response: Response, years: int = 10) -> BacktestResponse:
     """
     Get backtest results.
     Args:
@@ -147,17 +572,74 @@ async def get_backtest_results(years: int = 10) -> BacktestResponse:
         BacktestResponse: Backtest results.
     """
     try:
-        results = run_backtest(years=years, lookback_years = 3)
-        
-        if "error" in results:
-            raise HTTPException(status_code=500, detail=results["error"])
-        
-        return BacktestResponse(
-            strategy_metrics=results["strategy_metrics"],
-            benchmark_metrics=results["benchmark_metrics"],
-            strategy_cumulative=results["strategy_cumulative"],
-            benchmark_cumulative=results["benchmark_cumulative"],
-            dates=results["dates"]
-        )
+        # Only the last bar is needed for the validator; the backtest loads its own history.
+        df = get_latest_df(columns=['Close'], tail=1)
+        if df.empty:
+            raise HTTPException(status_code=500, detail="No data available")
+
+        def compute() -> BacktestResponse:
+            results = run_backtest(years=years, lookback_years = 3)
+            
+            if "error" in results:
+                raise HTTPException(status_code=500, detail=results["error"])
+            
+            return BacktestResponse(
+                strategy_metrics=results["strategy_metrics"],
+                benchmark_metrics=results["benchmark_metrics"],
+                strategy_cumulative=results["strategy_cumulative"],
+                benchmark_cumulative=results["benchmark_cumulative"],
+                dates=results["dates"]
+            )
+
+        # Walk-forward refits are deterministic, so the data version alone identifies the result.
+        etag = make_etag("backtest", SYMBOL, years, df.index[-1])
+        return conditional_response(request, response, etag, df.index[-1], compute)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/regime/batch", response_model=BatchRegimeResponse)
+async def get_batch_regime(symbols: List[str] = Query(...)) -> BatchRegimeResponse:
+    """
+    Get latest regime probabilities for several symbols.
+    Args:
+        symbols (List[str]): Comma-separated and/or repeated symbols.
+    Returns:
+        BatchRegimeResponse: Per-symbol regime probabilities and errors.
+    """
+    results, errors = await evaluate_batch(parse_symbols(symbols))
+    return BatchRegimeResponse(
+        results={
+            symbol: RegimeResponse(
+                bull_probability=float(snapshot["regime_probs"][0]),
+                bear_probability=float(snapshot["regime_probs"][1]),
+                sideways_probability=float(snapshot["regime_probs"][2]),
+                timestamp=snapshot["timestamp"]
+            )
+            for symbol, snapshot in results.items()
+        },
+        errors=errors
+    )
+
+@app.get("/signal/batch", response_model=BatchSignalResponse)
+async def get_batch_signal(symbols: List[str] = Query(...)) -> BatchSignalResponse:
+    """
+    Get latest trading signals for several symbols.
+    Args:
+        symbols (List[str]): Comma-separated and/or repeated symbols.
+    Returns:
+        BatchSignalResponse: Per-symbol trading signals and errors.
+    """
+    results, errors = await evaluate_batch(parse_symbols(symbols))
+    return BatchSignalResponse(
+        results={
+            symbol: SignalResponse(
+                action=snapshot["signal"]["action"],
+                confidence=snapshot["signal"]["confidence"],
+                regime_probs=snapshot["signal"]["regime_probs"],
+                weighted_signal=snapshot["signal"]["weighted_signal"],
+                timestamp=snapshot["timestamp"]
+            )
+            for symbol, snapshot in results.items()
+        },
+        errors=errors
+    )
@@ -0,0 +1,268 @@
+"""
+Versioned, read-only model artifacts for multi-worker serving.
+
+In production mode (``python run_app.py --prod``) a supervisor process loads
+the data and fits or loads each symbol's model once, and publishes them under
+``ARTIFACT_DIR/<symbol>/<version>/``: the index and Close prices as ``.npy``
+arrays plus a JSON manifest holding the HMM parameters. A ``CURRENT`` file
+names the live version and is replaced atomically, so a version directory is
+complete before any worker can see it.
+
+API workers memory-map the arrays (one page-cache copy shared by every
+worker), rebuild the GaussianHMM from its parameters without running EM, and
+swap to the new version as a unit when ``CURRENT`` changes.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from hmmlearn.hmm import GaussianHMM
+
+from .data_loader import get_latest_df
+from .model import RegimeHMM, data_version
+from .refresh import load_or_fit_model
+
+ARTIFACT_DIR = os.getenv('ARTIFACT_DIR', '')
+ARTIFACT_POLL_SECONDS = float(os.getenv('ARTIFACT_POLL_SECONDS', '2'))
+ARTIFACT_KEEP_VERSIONS = int(os.getenv('ARTIFACT_KEEP_VERSIONS', '3'))
+# Serving reads only Close prices and dates; other columns are not published.
+ARTIFACT_COLUMNS = ('Close',)
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+HMM_PARAMS = ('startprob_', 'transmat_', 'means_', '_covars_')
+
+
+class Artifacts(NamedTuple):
+    """One attached artifact version: data and model always come from the same publish."""
+    version: str
+    df: pd.DataFrame
+    model: RegimeHMM
+
+
+def symbol_dir(symbol: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or ARTIFACT_DIR, symbol)
+
+
+def artifact_version(df: pd.DataFrame, model: RegimeHMM) -> str:
+    return f"{data_version(df)}_{model.version()}"
+
+
+def write_current(path: str, version: str) -> None:
+    # Atomic pointer swap: readers see the old or the new version, never a partial file.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.current-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_current(symbol: str, directory: Optional[str] = None) -> Optional[str]:
+    try:
+        with open(os.path.join(symbol_dir(symbol, directory), CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(symbol: str, version: str, directory: Optional[str] = None) -> Dict[str, Any]:
+    with open(os.path.join(symbol_dir(symbol, directory), version, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def prune_versions(symbol: str, directory: Optional[str] = None, keep: int = ARTIFACT_KEEP_VERSIONS) -> None:
+    # Workers still mapping a removed version keep their open mappings until they swap.
+    base = symbol_dir(symbol, directory)
+    current = read_current(symbol, directory)
+    versions = [name for name in os.listdir(base)
+                if name != current and not name.startswith('.')
+                and os.path.isdir(os.path.join(base, name))]
+    versions.sort(key=lambda name: os.path.getmtime(os.path.join(base, name)), reverse=True)
+    for name in versions[max(keep - 1, 0):]:
+        shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+
+
+def publish_artifacts(symbol: str, df: pd.DataFrame, model: RegimeHMM,
+                      directory: Optional[str] = None) -> str:
+    """
+    Write a data/model version and make it current.
+    Args:
+        symbol (str): Ticker symbol.
+        df (pd.DataFrame): Full OHLCV history the model was fitted on.
+        model (RegimeHMM): Fitted model.
+        directory (Optional[str]): Artifact root; defaults to ARTIFACT_DIR.
+    Returns:
+        str: The published version.
+    """
+    if model.model is None:
+        raise ValueError('Model not fitted.')
+    base = symbol_dir(symbol, directory)
+    os.makedirs(base, exist_ok=True)
+    version = artifact_version(df, model)
+    final_dir = os.path.join(base, version)
+
+    if not os.path.isdir(final_dir):
+        tmp_dir = tempfile.mkdtemp(dir=base, prefix='.publish-')
+        try:
+            index = pd.DatetimeIndex(df.index)
+            # Stored as naive UTC datetime64; the zone goes in the manifest.
+            naive = index.tz_convert(None) if index.tz is not None else index
+            np.save(os.path.join(tmp_dir, 'index.npy'), naive.to_numpy())
+            for i, column in enumerate(ARTIFACT_COLUMNS):
+                values = df[column]
+                if isinstance(values, pd.DataFrame):
+                    values = values.iloc[:, 0]
+                np.save(os.path.join(tmp_dir, f'column_{i}.npy'), values.to_numpy())
+            manifest = {
+                "symbol": symbol,
+                "version": version,
+                "data_version": data_version(df),
+                "model_version": model.version(),
+                "published_at": datetime.now(timezone.utc).isoformat(),
+                "columns": list(ARTIFACT_COLUMNS),
+                "index_name": index.name,
+                "index_tz": str(index.tz) if index.tz is not None else None,
+                "n_states": model.n_states,
+                "covariance_type": model.covariance_type,
+                "params": {name: getattr(model.model, name).tolist() for name in HMM_PARAMS},
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f)
+            os.rename(tmp_dir, final_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            # Another publisher renamed the same version into place first.
+            if not os.path.isdir(final_dir):
+                raise
+
+    write_current(os.path.join(base, CURRENT_FILE), version)
+    prune_versions(symbol, directory)
+    return version
+
+
+def model_from_manifest(manifest: Dict[str, Any]) -> RegimeHMM:
+    # Rebuild the fitted GaussianHMM from its parameters; no EM iterations run.
+    model = RegimeHMM(n_states=manifest["n_states"], covariance_type=manifest["covariance_type"])
+    hmm = GaussianHMM(n_components=manifest["n_states"], covariance_type=manifest["covariance_type"])
+    params = manifest["params"]
+    hmm.n_features = len(params["means_"][0])
+    hmm.startprob_ = np.array(params["startprob_"])
+    hmm.transmat_ = np.array(params["transmat_"])
+    hmm.means_ = np.array(params["means_"])
+    hmm.covars_ = np.array(params["_covars_"])
+    model.model = hmm
+    return model
+
+
+def attach_artifacts(symbol: str, version: str, directory: Optional[str] = None) -> Artifacts:
+    """
+    Map a published version read-only.
+    Args:
+        symbol (str): Ticker symbol.
+        version (str): Published version.
+        directory (Optional[str]): Artifact root; defaults to ARTIFACT_DIR.
+    Returns:
+        Artifacts: The version, a DataFrame backed by the memory-mapped arrays, and the model.
+    """
+    path = os.path.join(symbol_dir(symbol, directory), version)
+    manifest = read_manifest(symbol, version, directory)
+    index = pd.DatetimeIndex(np.load(os.path.join(path, 'index.npy'), mmap_mode='r'),
+                             name=manifest["index_name"])
+    if manifest["index_tz"] is not None:
+        index = index.tz_localize('UTC').tz_convert(manifest["index_tz"])
+    columns = {
+        column: np.load(os.path.join(path, f'column_{i}.npy'), mmap_mode='r')
+        for i, column in enumerate(manifest["columns"])
+    }
+    df = pd.DataFrame(columns, index=index, copy=False)
+    return Artifacts(version, df, model_from_manifest(manifest))
+
+
+class ArtifactReader:
+    """
+    Worker-side handle on one symbol's published artifacts.
+
+    ``current()`` re-reads the CURRENT pointer at most every ``poll_seconds``
+    and attaches a new version when it changes. The swap is a single
+    reference assignment, so concurrent requests see either the old or the
+    new version as a whole. If a new version cannot be attached the old one
+    keeps serving.
+    """
+
+    def __init__(self, symbol: str, directory: Optional[str] = None,
+                 poll_seconds: float = ARTIFACT_POLL_SECONDS):
+        self.symbol = symbol
+        self.directory = directory
+        self.poll_seconds = poll_seconds
+        self._artifacts: Optional[Artifacts] = None
+        self._checked = float('-inf')
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[Artifacts]:
+        artifacts = self._artifacts
+        if time.monotonic() - self._checked < self.poll_seconds:
+            return artifacts
+        with self._lock:
+            if time.monotonic() - self._checked < self.poll_seconds:
+                return self._artifacts
+            self._checked = time.monotonic()
+            version = read_current(self.symbol, self.directory)
+            if version is not None and (self._artifacts is None or self._artifacts.version != version):
+                try:
+                    self._artifacts = attach_artifacts(self.symbol, version, self.directory)
+                    print(f"[artifacts] {self.symbol}: attached version {version}")
+                except Exception as e:
+                    print(f"[artifacts] {self.symbol}: failed to attach version {version}: {e}")
+            return self._artifacts
+
+
+def publish_symbol(symbol: str, directory: Optional[str] = None, force_refresh: bool = False,
+                   refit: bool = True) -> str:
+    """
+    Load data for a symbol and publish it with its model, fitting only when the data changed.
+    Args:
+        symbol (str): Ticker symbol.
+        directory (Optional[str]): Artifact root; defaults to ARTIFACT_DIR.
+        force_refresh (bool): Fetch new bars instead of using the data cache.
+        refit (bool): If False, reuse a previously saved model when available.
+    Returns:
+        str: The current version after publishing.
+    """
+    df = get_latest_df(force_refresh=force_refresh, symbol=symbol)
+    if df.empty:
+        raise ValueError(f"No data available for {symbol}")
+    current = read_current(symbol, directory)
+    if current is not None and read_manifest(symbol, current, directory)["data_version"] == data_version(df):
+        return current
+    model = load_or_fit_model(symbol, df, refit=refit)
+    return publish_artifacts(symbol, df, model, directory)
+
+
+def publish_loop(symbols: List[str], interval: float, stop: threading.Event,
+                 directory: Optional[str] = None) -> None:
+    """
+    Supervisor loop: republish every symbol with fresh data every ``interval`` seconds.
+    Args:
+        symbols (List[str]): Symbols to keep published.
+        interval (float): Seconds between refreshes.
+        stop (threading.Event): Set to end the loop.
+        directory (Optional[str]): Artifact root; defaults to ARTIFACT_DIR.
+    """
+    while not stop.wait(interval):
+        for symbol in symbols:
+            try:
+                version = publish_symbol(symbol, directory, force_refresh=True)
+                print(f"[artifacts] {symbol}: current version {version}")
+            except Exception as e:
+                print(f"[artifacts] {symbol}: publish failed: {e}")
@@ -1,9 +1,18 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, Tuple
-from .data_loader import get_latest_df
+import os
+import pickle
+import tempfile
+from typing import Dict, Any, Tuple, Optional
+from .data_loader import COMPACT_MODE, SYMBOL, get_latest_df
 from .model import RegimeHMM
-from .strategies import generate_signal
+from .strategies import IndicatorState, combine_signals, rsi_signal
+from .diagnostics import Diagnostics
+from .execution import simulate_execution
+from .bootstrap import bootstrap_metrics
+
+BACKTEST_CHECKPOINT_DIR = os.getenv('BACKTEST_CHECKPOINT_DIR', '')
+CHECKPOINT_VERSION = 4
 
 def calculate_returns(df: pd.DataFrame) -> pd.Series:
     close_prices = df['Close']
@@ -11,10 +20,10 @@ def calculate_returns(df: pd.DataFrame) -> pd.Series:
         close_prices = close_prices.iloc[:, 0]
     return close_prices.pct_change().dropna()
 
-def calculate_strategy_returns(df: pd.DataFrame, signals: pd.Series) -> pd.Series:
-    returns = calculate_returns(df)
-    strategy_returns = signals.shift(1) * returns
-    return strategy_returns.fillna(0)
+def calculate_strategy_returns(df: pd.DataFrame, signals: pd.Series,
+                               cost_bps: float = 0.0, slippage_bps: float = 0.0) -> pd.Series:
+    execution = simulate_execution(df, signals.rename('strategy'), cost_bps=cost_bps, slippage_bps=slippage_bps)
+    return execution["net_returns"]["strategy"]
 
 def calculate_metrics(returns: pd.Series) -> Dict[str, float]:
     if len(returns) == 0:
@@ -41,72 +50,240 @@ def calculate_metrics(returns: pd.Series) -> Dict[str, float]:
         "volatility": float(volatility)
     }
 
-def run_backtest(years: int = 10, lookback_years: int = 3) -> Dict[str, Any]:
-    df = get_latest_df()
+def build_validity_index(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Precompute per-bar arrays that make every walk-forward window check O(1).
+    A window [a, b) has no NaN close iff nan_closes[b] == nan_closes[a], and
+    bad_returns[b] - bad_returns[a + 1] of its b - a - 1 simple returns are NaN
+    (the ones pct_change().dropna() drops).
+    Args:
+        df (pd.DataFrame): OHLCV data.
+    Returns:
+        Dict[str, np.ndarray]: Cumulative NaN-close and NaN-return counts, rows with
+        any NaN, and daily log returns (log_returns[j] is from bar j - 1 to j).
+    """
+    close_prices = df['Close']
+    if isinstance(close_prices, pd.DataFrame):
+        close_prices = close_prices.iloc[:, 0]
+    close = close_prices.to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        simple_returns = close[1:] / close[:-1] - 1
+        log_close = np.log(close)
+    bad_return = np.concatenate([[True], np.isnan(simple_returns)])
+    return {
+        "nan_closes": np.concatenate([[0], np.cumsum(np.isnan(close))]),
+        "bad_returns": np.concatenate([[0], np.cumsum(bad_return)]),
+        "row_has_nan": df.isnull().to_numpy().any(axis=1),
+        "log_returns": np.concatenate([[np.nan], np.diff(log_close)]),
+    }
+
+def checkpoint_path_for(lookback_years: int, symbol: str = SYMBOL) -> Optional[str]:
+    if not BACKTEST_CHECKPOINT_DIR:
+        return None
+    return os.path.join(BACKTEST_CHECKPOINT_DIR, f'backtest_{symbol}_{lookback_years}y.pkl')
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    """
+    Atomically write walk-forward state (per-day results keyed by date).
+    Args:
+        path (str): Checkpoint file path.
+        state (Dict[str, Any]): State to persist.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # A unique temp file per writer, so concurrent runs cannot clobber each other's partial writes.
+    fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=f'.{os.path.basename(path)}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(state, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def load_checkpoint(path: str, lookback_days: int) -> Optional[Dict[str, Any]]:
+    """
+    Load a checkpoint if it was written with the same walk-forward window.
+    A day's result depends only on its trailing window, so stored days are
+    reused by date wherever they still fall in the current data, even after
+    the history window has moved forward.
+    Args:
+        path (str): Checkpoint file path.
+        lookback_days (int): Walk-forward window length.
+    Returns:
+        Optional[Dict[str, Any]]: Checkpoint state, or None to start from scratch.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+    except Exception as e:
+        print(f"Backtest checkpoint {path} unreadable ({e}), starting from scratch")
+        return None
+    if state.get("version") != CHECKPOINT_VERSION or state.get("lookback_days") != lookback_days:
+        print(f"Backtest checkpoint {path} does not match the current window, starting from scratch")
+        return None
+    return state
+
+def run_backtest(years: int = 10, lookback_years: int = 3, verbose: Optional[bool] = None,
+                 checkpoint_path: Optional[str] = None, checkpoint_every: int = 100,
+                 position_mode: str = 'discrete', cost_bps: float = 0.0,
+                 slippage_bps: float = 0.0, bootstrap_resamples: int = 0,
+                 compact: Optional[bool] = None) -> Dict[str, Any]:
+    if position_mode not in ('discrete', 'weighted'):
+        raise ValueError("position_mode must be 'discrete' or 'weighted'")
+    compact = COMPACT_MODE if compact is None else compact
+    df = get_latest_df(compact=compact)
     if df.empty:
         print("Backtest error: No data available")
         return {"error": "No data available"}
+    # Per-day skip/fallback reasons are counted, not printed, unless verbose.
+    diagnostics = Diagnostics('backtest', verbose=verbose)
     min_valid_obs = 100
+    n_states = 3
     lookback_days = max(int(lookback_years * 252), min_valid_obs + 1)
-    signals = []
-    regime_probs = []
-    dates = []
 
-    for i in range(lookback_days, len(df)):
-        lookback_df = df.iloc[i - lookback_days : i]
-        close_prices = lookback_df['Close']
+    # Per-day results live in preallocated typed arrays indexed by i - lookback_days;
+    # `valid` marks days that produced a signal.
+    n_days = max(len(df) - lookback_days, 0)
+    float_dtype = np.float32 if compact else np.float64
+    valid = np.zeros(n_days, dtype=bool)
+    signals = np.zeros(n_days, dtype=np.int8)
+    weighted_signals = np.zeros(n_days, dtype=float_dtype)
+    regime_probs = np.zeros((n_days, n_states), dtype=float_dtype)
+    # Days whose results exist (valid or skipped); only the others are computed.
+    computed = np.zeros(n_days, dtype=bool)
+
+    # Resume by date: stored days still inside the current data are reused.
+    checkpoint_path = checkpoint_path or checkpoint_path_for(lookback_years)
+    state = load_checkpoint(checkpoint_path, lookback_days) if checkpoint_path else None
+    if state is not None:
+        positions = df.index.get_indexer(state["dates"]) - lookback_days
+        keep = positions >= 0
+        rows = positions[keep]
+        computed[rows] = True
+        valid[rows] = state["valid"][keep]
+        signals[rows] = state["signals"][keep]
+        weighted_signals[rows] = state["weighted_signals"][keep]
+        regime_probs[rows] = state["regime_probs"][keep]
+
+    def checkpoint() -> None:
+        save_checkpoint(checkpoint_path, {
+            "version": CHECKPOINT_VERSION,
+            "lookback_days": lookback_days,
+            "dates": df.index[lookback_days:][computed],
+            "valid": valid[computed],
+            "signals": signals[computed],
+            "weighted_signals": weighted_signals[computed],
+            "regime_probs": regime_probs[computed],
+        })
+
+    # Window checks are O(1) lookups into cumulative counts; the loop slices arrays, not frames.
+    index = build_validity_index(df)
+    nan_closes, bad_returns = index["nan_closes"], index["bad_returns"]
+    row_has_nan, log_returns = index["row_has_nan"], index["log_returns"]
+    close = df['Close']
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    close = close.to_numpy()
+    # Strategy indicators advance one bar per day; after a gap they are rebuilt from history.
+    pending = np.flatnonzero(~computed) + lookback_days
+    ma_in_window = lookback_days >= IndicatorState().ma.long.window
+    indicators = None
+    previous = None
+
+    for n, i in enumerate(pending):
+        if checkpoint_path and n > 0 and n % checkpoint_every == 0:
+            checkpoint()
+        if previous is None or i != previous + 1:
+            indicators = IndicatorState.from_df(df.iloc[:max(i - 1, 0)])
+        previous = i
+        indicators.update(close[i - 1])
+        computed[i - lookback_days] = True
 
-        # Window must be correct size and no NaNs
-        if len(lookback_df) != lookback_days or close_prices.isnull().any():
-            print(f"Backtest error on day {i}: Invalid window (len={len(lookback_df)}), skipping")
+        # Window must have no NaNs
+        if nan_closes[i] != nan_closes[i - lookback_days]:
+            diagnostics.record('invalid_window', f"Invalid window (len={lookback_days}), skipping", day=i)
             continue
 
         # Returns must have at least min_valid_obs (so at least min_valid_obs + 1 prices)
-        returns = close_prices.pct_change().dropna()
-        if len(returns) < min_valid_obs:
-            print(f"Backtest error on day {i}: Not enough returns in window (returns={len(returns)}), skipping")
+        n_returns = lookback_days - 1 - (bad_returns[i] - bad_returns[i - lookback_days + 1])
+        if n_returns < min_valid_obs:
+            diagnostics.record('insufficient_returns',
+                               f"Not enough returns in window (returns={n_returns}), skipping", day=i)
+            continue
+
+        # Prediction uses the last two bars; checked before fitting so discarded days cost no EM fit
+        if row_has_nan[i - 1] or row_has_nan[i]:
+            diagnostics.record('invalid_current_window', "Current df not enough rows or contains NaNs", day=i)
             continue
 
         try:
-            hmm = RegimeHMM(n_states=3)
-            hmm.fit(lookback_df)
-            # >>>> Always use last two rows for predict_proba <<<<
-            current_df = df.iloc[i-1:i+1]
-            if len(current_df) < 2 or current_df.isnull().any().any():
-                print(f"Backtest error on day {i}: Current df not enough rows or contains NaNs")
-                continue
-            # This ensures .diff() in predict_proba will have at least 1 value
-            probs = hmm.predict_proba(current_df)
-            regime_probs.append(probs)
-            signal_data = generate_signal(probs, lookback_df)
+            hmm = RegimeHMM(n_states=n_states, diagnostics=diagnostics)
+            hmm.fit_returns(log_returns[i - lookback_days + 1 : i])
+            probs = hmm.predict_proba_returns(log_returns[i : i + 1])
+            bull_signal = indicators.ma.value if ma_in_window else 0.0
+            signal_data = combine_signals(probs, bull_signal, rsi_signal(indicators.rsi.value), 0.0)
+            k = i - lookback_days
+            regime_probs[k] = probs
+            weighted_signals[k] = signal_data["weighted_signal"]
             if signal_data["action"] == "BUY":
-                signals.append(1)
+                signals[k] = 1
             elif signal_data["action"] == "SELL":
-                signals.append(-1)
+                signals[k] = -1
             else:
-                signals.append(0)
-            dates.append(df.index[i])
+                signals[k] = 0
+            valid[k] = True
         except Exception as e:
-            print(f"Backtest error on day {i}: {e}")
+            diagnostics.record('day_exception', str(e), day=i)
             continue
 
-    if len(signals) == 0:
+    if checkpoint_path and len(pending) > 0:
+        checkpoint()
+
+    diagnostics.log_summary()
+    if not valid.any():
         print("Backtest error: No valid backtest results generated")
-        return {"error": "No valid backtest results generated"}
-    signals_series = pd.Series(signals, index=dates)
+        return {"error": "No valid backtest results generated", "diagnostics": diagnostics.summary()}
+    dates = df.index[lookback_days:][valid]
+    signals = signals[valid]
+    weighted_signals = weighted_signals[valid]
+    regime_probs = regime_probs[valid]
     backtest_df = df.loc[dates]
-    strategy_returns = calculate_strategy_returns(backtest_df, signals_series)
+    # Discrete ±1/0 actions and probability-weighted fractional exposure, simulated together.
+    targets = pd.DataFrame({"discrete": signals, "weighted": weighted_signals}, index=dates, dtype=np.float64)
+    execution = simulate_execution(backtest_df, targets, cost_bps=cost_bps,
+                                   slippage_bps=slippage_bps, max_leverage=1.0)
+    strategy_returns = execution["net_returns"][position_mode]
     benchmark_returns = calculate_returns(backtest_df)
     strategy_metrics = calculate_metrics(strategy_returns)
     benchmark_metrics = calculate_metrics(benchmark_returns)
     strategy_cumulative = (1 + strategy_returns).cumprod()
     benchmark_cumulative = (1 + benchmark_returns).cumprod()
-    return {
+    results = {
         "strategy_metrics": strategy_metrics,
         "benchmark_metrics": benchmark_metrics,
         "strategy_cumulative": strategy_cumulative.tolist(),
         "benchmark_cumulative": benchmark_cumulative.tolist(),
         "dates": [d.strftime('%Y-%m-%d') for d in dates],
-        "signals": signals,
-        "regime_probs": [probs.tolist() for probs in regime_probs]
+        "signals": signals.tolist(),
+        "weighted_signals": weighted_signals.tolist(),
+        "regime_probs": regime_probs.tolist(),
+        "execution": {
+            mode: {
+                "metrics": calculate_metrics(execution["net_returns"][mode]),
+                "turnover": float(execution["turnover"][mode].sum()),
+                "costs": float(execution["costs"][mode].sum()),
+            }
+            for mode in targets.columns
+        },
+        "diagnostics": diagnostics.summary()
     }
+    if bootstrap_resamples > 0:
+        results["confidence_intervals"] = bootstrap_metrics(
+            strategy_returns, benchmark_returns, n_resamples=bootstrap_resamples
+        )
+    return results
@@ -0,0 +1,174 @@
+"""
+Block-bootstrap confidence intervals for backtest metrics.
+
+Strategy and benchmark returns are resampled with the same indices (paired),
+so the interval on their difference accounts for their correlation. Resamples
+are generated and scored as batched NumPy arrays, chunk by chunk, and chunks
+are spread across processes. Each chunk has its own child seed, so results do
+not depend on the number of workers.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+METRICS = ("annualized_return", "sharpe_ratio", "max_drawdown", "volatility")
+BOOTSTRAP_CHUNK_SIZE = 500
+
+
+def stationary_bootstrap_indices(n: int, n_resamples: int, mean_block: float,
+                                 rng: np.random.Generator) -> np.ndarray:
+    """
+    Politis-Romano stationary bootstrap: blocks of geometric length (mean ``mean_block``)
+    starting at uniform positions, wrapping around the end of the series.
+    Returns:
+        np.ndarray: (n_resamples, n) array of indices.
+    """
+    positions = np.arange(n)
+    new_block = rng.random((n_resamples, n)) < 1.0 / mean_block
+    new_block[:, 0] = True
+    block_start = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+    starts = rng.integers(0, n, size=(n_resamples, n))
+    first = np.take_along_axis(starts, block_start, axis=1)
+    return (first + positions - block_start) % n
+
+
+def moving_block_bootstrap_indices(n: int, n_resamples: int, block_length: int,
+                                   rng: np.random.Generator) -> np.ndarray:
+    """
+    Moving block bootstrap: fixed-length overlapping blocks concatenated and trimmed to ``n``.
+    Returns:
+        np.ndarray: (n_resamples, n) array of indices.
+    """
+    block_length = max(1, min(block_length, n))
+    n_blocks = -(-n // block_length)
+    starts = rng.integers(0, n - block_length + 1, size=(n_resamples, n_blocks))
+    indices = starts[:, :, None] + np.arange(block_length)
+    return indices.reshape(n_resamples, -1)[:, :n]
+
+
+def batch_metrics(returns: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Vectorized equivalent of backtest.calculate_metrics over the rows of ``returns``.
+    Args:
+        returns (np.ndarray): (n_resamples, n) daily returns.
+    Returns:
+        Dict[str, np.ndarray]: One value per resample for each metric.
+    """
+    n = returns.shape[1]
+    growth = 1.0 + returns
+    cumulative = np.cumprod(growth, axis=1)
+    total_return = cumulative[:, -1] - 1.0
+    years = n / 252
+    annualized_return = (1.0 + total_return) ** (1.0 / years) - 1.0
+    std = returns.std(axis=1, ddof=1)
+    excess_mean = returns.mean(axis=1) - 0.02 / 252
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe_ratio = np.where(std > 0, np.sqrt(252) * excess_mean / std, 0.0)
+    running_max = np.maximum.accumulate(cumulative, axis=1)
+    max_drawdown = ((cumulative - running_max) / running_max).min(axis=1)
+    return {
+        "annualized_return": annualized_return,
+        "sharpe_ratio": sharpe_ratio,
+        "max_drawdown": max_drawdown,
+        "volatility": std * np.sqrt(252),
+    }
+
+
+def _bootstrap_chunk(strategy: np.ndarray, benchmark: np.ndarray, n_resamples: int,
+                     method: str, block_length: float, seed: np.random.SeedSequence) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = len(strategy)
+    if method == "stationary":
+        indices = stationary_bootstrap_indices(n, n_resamples, block_length, rng)
+    else:
+        indices = moving_block_bootstrap_indices(n, n_resamples, int(round(block_length)), rng)
+    strategy_metrics = batch_metrics(strategy[indices])
+    benchmark_metrics = batch_metrics(benchmark[indices])
+    # Shape (2, n_metrics, n_resamples): strategy then benchmark.
+    return np.stack([
+        np.stack([strategy_metrics[m] for m in METRICS]),
+        np.stack([benchmark_metrics[m] for m in METRICS]),
+    ])
+
+
+def bootstrap_metrics(strategy_returns: pd.Series, benchmark_returns: pd.Series,
+                      n_resamples: int = 10000, method: str = "stationary",
+                      block_length: Optional[float] = None, confidence: float = 0.95,
+                      n_jobs: Optional[int] = None, seed: int = 42) -> Dict[str, Any]:
+    """
+    Confidence intervals for every backtest metric of a strategy, its benchmark and their difference.
+    Args:
+        strategy_returns (pd.Series): Daily strategy returns.
+        benchmark_returns (pd.Series): Daily benchmark returns (aligned on the common dates).
+        n_resamples (int): Number of bootstrap resamples.
+        method (str): 'stationary' or 'block' (moving block).
+        block_length (Optional[float]): Mean (stationary) or fixed (block) block length;
+            defaults to n ** (1/3).
+        confidence (float): Two-sided confidence level.
+        n_jobs (Optional[int]): Worker processes; defaults to the CPU count, 1 runs in-process.
+        seed (int): Base random seed.
+    Returns:
+        Dict[str, Any]: Point estimate, standard error and interval per metric for
+        'strategy', 'benchmark' and 'difference', plus the probability that the
+        strategy's Sharpe exceeds the benchmark's.
+    """
+    if method not in ("stationary", "block"):
+        raise ValueError("method must be 'stationary' or 'block'")
+    if n_resamples <= 0:
+        raise ValueError("n_resamples must be positive")
+    if block_length is not None and block_length <= 0:
+        raise ValueError("block_length must be positive")
+    aligned = pd.concat([strategy_returns, benchmark_returns], axis=1, join="inner").dropna()
+    if len(aligned) < 2:
+        raise ValueError("Need at least 2 aligned returns to bootstrap")
+    strategy = aligned.iloc[:, 0].to_numpy(dtype=np.float64)
+    benchmark = aligned.iloc[:, 1].to_numpy(dtype=np.float64)
+    n = len(strategy)
+    block_length = block_length or max(1.0, n ** (1 / 3))
+
+    chunk_sizes = [BOOTSTRAP_CHUNK_SIZE] * (n_resamples // BOOTSTRAP_CHUNK_SIZE)
+    if n_resamples % BOOTSTRAP_CHUNK_SIZE:
+        chunk_sizes.append(n_resamples % BOOTSTRAP_CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    args = [(strategy, benchmark, size, method, block_length, s) for size, s in zip(chunk_sizes, seeds)]
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(args) == 1:
+        chunks = [_bootstrap_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(args))) as executor:
+            chunks = list(executor.map(_bootstrap_chunk, *zip(*args)))
+    samples = np.concatenate(chunks, axis=2)
+
+    point_strategy = batch_metrics(strategy[None, :])
+    point_benchmark = batch_metrics(benchmark[None, :])
+    alpha = (1.0 - confidence) / 2.0
+
+    def summarize(values: np.ndarray, point: float) -> Dict[str, float]:
+        lower, upper = np.quantile(values, [alpha, 1.0 - alpha])
+        return {
+            "point": float(point),
+            "std_error": float(values.std(ddof=1)),
+            "lower": float(lower),
+            "upper": float(upper),
+        }
+
+    result: Dict[str, Any] = {"strategy": {}, "benchmark": {}, "difference": {}}
+    for k, metric in enumerate(METRICS):
+        s_point = point_strategy[metric][0]
+        b_point = point_benchmark[metric][0]
+        result["strategy"][metric] = summarize(samples[0, k], s_point)
+        result["benchmark"][metric] = summarize(samples[1, k], b_point)
+        result["difference"][metric] = summarize(samples[0, k] - samples[1, k], s_point - b_point)
+
+    sharpe = METRICS.index("sharpe_ratio")
+    result["prob_sharpe_outperform"] = float(np.mean(samples[0, sharpe] > samples[1, sharpe]))
+    result["n_resamples"] = n_resamples
+    result["method"] = method
+    result["block_length"] = float(block_length)
+    result["confidence"] = confidence
+    return result
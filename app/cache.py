@@ -0,0 +1,219 @@
+"""
+Tiered read-through / write-back cache for data and model artifacts.
+
+Tiers are tried in order: in-process memory (decoded objects), a local
+directory (``/tmp`` on Lambda, lost with the container) and a shared
+S3-compatible object store that outlives containers. A hit in a lower tier is
+copied back into the tiers above it, and writes go to every tier, so a fresh
+Lambda container warms from the shared tier instead of refetching from
+yfinance and refitting.
+
+Enabled with CACHE_TIERS, e.g. ``memory,tmp,s3``. CACHE_BUCKET names the
+shared bucket; ``file:///path`` uses a local directory as the shared tier
+(handy for tests and single-host deployments), and CACHE_S3_ENDPOINT_URL
+points boto3 at any S3-compatible service.
+"""
+
+import os
+import tempfile
+import time
+from typing import Any, Callable, List, Optional
+
+from .http_cache import ResponseCache
+
+CACHE_TIERS = os.getenv('CACHE_TIERS', '')
+CACHE_TMP_DIR = os.getenv('CACHE_TMP_DIR', '/tmp/regime-cache')
+CACHE_BUCKET = os.getenv('CACHE_BUCKET', '')
+CACHE_PREFIX = os.getenv('CACHE_PREFIX', 'regime-cache/')
+CACHE_S3_ENDPOINT_URL = os.getenv('CACHE_S3_ENDPOINT_URL') or None
+CACHE_MEMORY_TTL = float(os.getenv('CACHE_MEMORY_TTL', '300'))
+CACHE_MEMORY_SIZE = int(os.getenv('CACHE_MEMORY_SIZE', '256'))
+CACHE_TMP_TTL = float(os.getenv('CACHE_TMP_TTL', '3600'))
+
+
+class FileTier:
+    """Byte tier backed by a local directory; entries older than ``max_age`` seconds are misses."""
+
+    def __init__(self, directory: str = CACHE_TMP_DIR, max_age: Optional[float] = None):
+        self.directory = directory
+        self.max_age = max_age
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, *key.split('/'))
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            if self.max_age is not None and time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class ObjectStoreTier:
+    """Byte tier backed by an S3-compatible bucket."""
+
+    def __init__(self, bucket: str = CACHE_BUCKET, prefix: str = CACHE_PREFIX,
+                 client: Any = None, endpoint_url: Optional[str] = CACHE_S3_ENDPOINT_URL):
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = client
+        self._endpoint_url = endpoint_url
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('s3', endpoint_url=self._endpoint_url)
+        return self._client
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return response['Body'].read()
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+
+class TieredCache:
+    """
+    In-process memory of decoded objects in front of a list of byte tiers.
+    Tier failures are logged and treated as misses so a broken shared store
+    degrades to recomputation instead of failing requests.
+    """
+
+    def __init__(self, tiers: List[Any], memory: bool = True, memory_ttl: Optional[float] = CACHE_MEMORY_TTL,
+                 memory_size: int = CACHE_MEMORY_SIZE):
+        self.tiers = tiers
+        self.memory = memory
+        self.memory_ttl = memory_ttl
+        # LRU of (stored_at, value): per-day model and selection keys would otherwise pile up.
+        self._memory = ResponseCache(maxsize=memory_size)
+
+    def _memory_get(self, key: str) -> Optional[Any]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.memory_ttl is not None and time.monotonic() - stored_at > self.memory_ttl:
+            self._memory.pop(key)
+            return None
+        return value
+
+    def _memory_put(self, key: str, value: Any) -> None:
+        if self.memory:
+            self._memory.put(key, (time.monotonic(), value))
+
+    def get(self, key: str, deserialize: Optional[Callable[[bytes], Any]] = None) -> Optional[Any]:
+        """
+        Read ``key`` through the tiers, copying a lower-tier hit into the tiers above it.
+        Args:
+            key (str): Cache key, '/'-separated.
+            deserialize (Optional[Callable[[bytes], Any]]): Decoder for byte tiers.
+        Returns:
+            Optional[Any]: Cached object, or None on a miss in every tier.
+        """
+        value = self._memory_get(key) if self.memory else None
+        if value is not None:
+            return value
+        for k, tier in enumerate(self.tiers):
+            try:
+                data = tier.get(key)
+            except Exception as e:
+                print(f"[cache] {type(tier).__name__} get {key} failed: {e}")
+                continue
+            if data is None:
+                continue
+            for upper in self.tiers[:k]:
+                try:
+                    upper.put(key, data)
+                except Exception as e:
+                    print(f"[cache] {type(upper).__name__} put {key} failed: {e}")
+            value = deserialize(data) if deserialize else data
+            self._memory_put(key, value)
+            return value
+        return None
+
+    def put(self, key: str, value: Any, serialize: Optional[Callable[[Any], bytes]] = None) -> None:
+        """
+        Write ``value`` to memory and every byte tier.
+        Args:
+            key (str): Cache key, '/'-separated.
+            value (Any): Object to cache.
+            serialize (Optional[Callable[[Any], bytes]]): Encoder for byte tiers.
+        """
+        self._memory_put(key, value)
+        data = serialize(value) if serialize else value
+        for tier in self.tiers:
+            try:
+                tier.put(key, data)
+            except Exception as e:
+                print(f"[cache] {type(tier).__name__} put {key} failed: {e}")
+
+    def invalidate(self, key: str) -> None:
+        self._memory.pop(key)
+
+    def clear(self) -> None:
+        # Drops only the in-process memory; byte tiers are shared and left alone.
+        self._memory.clear()
+
+
+def build_cache(spec: str = CACHE_TIERS) -> Optional[TieredCache]:
+    """
+    Build a TieredCache from a comma-separated tier list ('memory', 'tmp', 's3').
+    Args:
+        spec (str): Tier list; empty disables caching.
+    Returns:
+        Optional[TieredCache]: Configured cache, or None if disabled.
+    """
+    names = [name.strip().lower() for name in spec.split(',') if name.strip()]
+    if not names:
+        return None
+    tiers: List[Any] = []
+    for name in names:
+        if name == 'memory':
+            continue
+        if name == 'tmp':
+            tiers.append(FileTier(CACHE_TMP_DIR, max_age=CACHE_TMP_TTL))
+        elif name == 's3':
+            if CACHE_BUCKET.startswith('file://'):
+                tiers.append(FileTier(CACHE_BUCKET[len('file://'):]))
+            elif CACHE_BUCKET:
+                tiers.append(ObjectStoreTier(CACHE_BUCKET))
+            else:
+                print("[cache] CACHE_TIERS includes s3 but CACHE_BUCKET is not set; skipping")
+        else:
+            raise ValueError(f"Unknown cache tier '{name}'")
+    return TieredCache(tiers, memory='memory' in names)
+
+
+_cache: Optional[TieredCache] = None
+_cache_built = False
+
+
+def get_cache() -> Optional[TieredCache]:
+    global _cache, _cache_built
+    if not _cache_built:
+        _cache = build_cache()
+        _cache_built = True
+    return _cache
+
+
+def set_cache(cache: Optional[TieredCache]) -> None:
+    # Override the process-wide cache (tests, scripts).
+    global _cache, _cache_built
+    _cache = cache
+    _cache_built = True
@@ -1,10 +1,89 @@
+import bisect
+import hashlib
+import io
+import json
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yfinance as yf
-from typing import Optional, cast
+from typing import Any, Dict, Iterator, List, Optional, Tuple, cast
 
-PARQUET_PATH = 'app/data_cache.parquet'
+from .cache import get_cache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: refreshes are not coalesced
+    fcntl = None  # type: ignore
+
+DATA_CACHE_DIR = os.getenv('DATA_CACHE_DIR', 'app')
+PARQUET_PATH = os.path.join(DATA_CACHE_DIR, 'data_cache.parquet')
 SYMBOL = os.getenv('SYMBOL', 'SPY')
+COMPACT_MODE = os.getenv('COMPACT_MODE', '').lower() in ('1', 'true', 'yes')
+# About one trading year per row group, so a recent-window read touches only the last group or two.
+PARQUET_ROW_GROUP_SIZE = int(os.getenv('PARQUET_ROW_GROUP_SIZE', '252'))
+# Written into the parquet schema metadata once the index has been de-duplicated.
+DEDUPLICATED_KEY = b'regime.deduplicated'
+
+# mkstemp creates 0600 files; replacements get the mode a plain open() would have given.
+# Read once at import, since os.umask can only be read by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+# Paths whose refresh lock the current thread holds, so nested refresh_lock calls do not deadlock.
+_held_locks = threading.local()
+
+# Last successfully read full frame per cache file, keyed by the file's identity.
+_snapshots: Dict[str, Tuple[Tuple[int, int, int], pd.DataFrame]] = {}
+_snapshot_lock = threading.Lock()
+
+
+def cache_path_for(symbol: str = SYMBOL) -> str:
+    """
+    Resolve the parquet cache path for a symbol.
+    The default symbol keeps using PARQUET_PATH; others get a sibling file.
+    Args:
+        symbol (str): Ticker symbol.
+    Returns:
+        str: Path to the symbol's parquet file.
+    """
+    if symbol == SYMBOL:
+        return PARQUET_PATH
+    return os.path.join(os.path.dirname(PARQUET_PATH), f'data_cache_{symbol}.parquet')
+
+
+def data_cache_key(symbol: str = SYMBOL) -> str:
+    return f'data/{symbol}.parquet'
+
+
+def write_parquet(df: pd.DataFrame, where: Any) -> None:
+    """
+    Write the cache layout: index de-duplicated and sorted, marked as such in the
+    schema metadata, in PARQUET_ROW_GROUP_SIZE row groups with min/max statistics.
+    Args:
+        df (pd.DataFrame): Date-indexed frame.
+        where: Path or writable binary buffer.
+    """
+    df = df[~df.index.duplicated(keep='first')].sort_index()
+    table = pa.Table.from_pandas(df)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), DEDUPLICATED_KEY: b'1'})
+    pq.write_table(table, where, row_group_size=PARQUET_ROW_GROUP_SIZE)
+
+
+def df_to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    write_parquet(df, buffer)
+    return buffer.getvalue()
+
+
+def df_from_parquet_bytes(data: bytes) -> pd.DataFrame:
+    return pd.read_parquet(io.BytesIO(data))
 
 
 def fetch_ohlcv(symbol: str = SYMBOL, period: str = '10y') -> pd.DataFrame:
@@ -24,52 +103,370 @@ def fetch_ohlcv(symbol: str = SYMBOL, period: str = '10y') -> pd.DataFrame:
 
 
 
-def cache_data(df: pd.DataFrame, path: str = PARQUET_PATH) -> None:
+def to_compact(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcast float columns to float32 (integer columns such as Volume are kept).
+    Args:
+        df (pd.DataFrame): OHLCV or derived-feature frame.
+    Returns:
+        pd.DataFrame: Frame with float32 float columns.
+    """
+    float_columns = df.select_dtypes(include='floating').columns
+    if len(float_columns) == 0:
+        return df
+    return df.astype({column: np.float32 for column in float_columns})
+
+
+def manifest_path(path: str) -> str:
+    return path + '.manifest.json'
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    # Write a sibling temp file and rename it over path: readers see the old or the new file, never a partial one.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=f'.{os.path.basename(path)}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_manifest(path: str = PARQUET_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Read the version manifest written next to a cache file.
+    Args:
+        path (str): Path to parquet file.
+    Returns:
+        Optional[Dict[str, Any]]: Manifest, or None if the file has none.
+    """
+    try:
+        with open(manifest_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def cache_data(df: pd.DataFrame, path: str = PARQUET_PATH, compact: Optional[bool] = None) -> None:
     """
     Cache the DataFrame to a local parquet file.
+    The file is replaced atomically and then described by a version manifest
+    (``<path>.manifest.json``) with its generation, rows, date range, size and
+    SHA-256, so concurrent readers never see a partially written file.
     Args:
         df (pd.DataFrame): DataFrame to cache.
         path (str): Path to parquet file.
+        compact (Optional[bool]): Store float columns as float32; defaults to COMPACT_MODE.
+    """
+    if COMPACT_MODE if compact is None else compact:
+        df = to_compact(df)
+    data = df_to_parquet_bytes(df)
+    index = df.index.unique()
+    # The generation is read and bumped under the refresh lock, so concurrent writers never share one.
+    with refresh_lock(path):
+        atomic_write(path, data)
+        previous = read_manifest(path) or {}
+        manifest = {
+            "version": f"{pd.Timestamp(index.max()).strftime('%Y%m%d')}_{len(index)}" if len(index) else 'empty',
+            "generation": previous.get("generation", 0) + 1,
+            "rows": len(index),
+            "start": str(index.min()) if len(index) else None,
+            "end": str(index.max()) if len(index) else None,
+            "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "written_at": datetime.now(timezone.utc).isoformat(),
+        }
+        atomic_write(manifest_path(path), json.dumps(manifest).encode())
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    # Changes whenever the file is replaced (new inode) or rewritten.
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def cache_version(path: str) -> Tuple[Optional[int], Optional[Tuple[int, int, int]]]:
+    # Changes on every refresh: the manifest generation, plus the file identity for caches without a manifest.
+    return (read_manifest(path) or {}).get("generation"), file_signature(path)
+
+
+@contextmanager
+def refresh_lock(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on ``<path>.lock`` while refreshing a cache file, across
+    threads and processes. Re-entrant within a thread. Best effort: without fcntl
+    or a writable directory the refresh runs unlocked.
+    Args:
+        path (str): Path to parquet file.
+    """
+    held = getattr(_held_locks, 'paths', None)
+    if held is None:
+        held = _held_locks.paths = set()
+    lock_file = None
+    if fcntl is not None and path not in held:
+        try:
+            lock_file = open(path + '.lock', 'a')
+        except OSError:
+            lock_file = None
+    if lock_file is None:
+        yield
+        return
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        held.add(path)
+        try:
+            yield
+        finally:
+            held.discard(path)
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def date_row_groups(parquet_file: pq.ParquetFile, start: Any = None, end: Any = None,
+                    sorted_index: bool = False) -> Optional[List[int]]:
+    """
+    Row groups whose index min/max statistics overlap [start, end].
+    Args:
+        parquet_file (pq.ParquetFile): Open cache file.
+        start: First date wanted, or None.
+        end: Last date wanted, or None.
+        sorted_index (bool): The index is sorted across groups (files written by
+            cache_data), so the bounds can be binary-searched.
+    Returns:
+        Optional[List[int]]: Row groups to read, or None if they cannot be pruned.
     """
-    df.to_parquet(path)
+    index_columns = (parquet_file.schema_arrow.pandas_metadata or {}).get('index_columns', [])
+    if not index_columns or not isinstance(index_columns[0], str):
+        return None
+    position = parquet_file.schema_arrow.get_field_index(index_columns[0])
+    metadata = parquet_file.metadata
+    n_groups = metadata.num_row_groups
+    bounds: Dict[int, tuple] = {}
 
+    def group_bounds(group: int) -> Optional[tuple]:
+        if group not in bounds:
+            statistics = metadata.row_group(group).column(position).statistics
+            if statistics is None or not statistics.has_min_max:
+                return None
+            bounds[group] = (pd.Timestamp(statistics.min), pd.Timestamp(statistics.max))
+        return bounds[group]
 
-def load_cached_data(path: str = PARQUET_PATH) -> pd.DataFrame:  # type: ignore
+    if n_groups == 0 or group_bounds(0) is None:
+        return None
+    tz = group_bounds(0)[0].tzinfo
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    if tz is not None:
+        # Bounds are compared in the stored timezone.
+        start = start.tz_localize(tz) if start is not None and start.tzinfo is None else start
+        end = end.tz_localize(tz) if end is not None and end.tzinfo is None else end
+
+    if sorted_index:
+        first = bisect.bisect_left(range(n_groups), True, key=lambda g: start is None or group_bounds(g)[1] >= start)
+        last = bisect.bisect_left(range(n_groups), True, key=lambda g: end is not None and group_bounds(g)[0] > end)
+        return list(range(first, last))
+
+    groups = []
+    for group in range(n_groups):
+        group_range = group_bounds(group)
+        if group_range is None:
+            return None
+        low, high = group_range
+        if (start is None or high >= start) and (end is None or low <= end):
+            groups.append(group)
+    return groups
+
+
+def tail_row_groups(parquet_file: pq.ParquetFile, n_rows: int) -> List[int]:
+    # Smallest run of trailing row groups holding at least n_rows rows.
+    metadata = parquet_file.metadata
+    groups: List[int] = []
+    rows = 0
+    for group in range(metadata.num_row_groups - 1, -1, -1):
+        groups.insert(0, group)
+        rows += metadata.row_group(group).num_rows
+        if rows >= n_rows:
+            break
+    return groups
+
+
+def select_rows(df: pd.DataFrame, columns: Optional[List[str]] = None, start: Any = None,
+                end: Any = None, tail: Optional[int] = None) -> pd.DataFrame:
+    # In-memory equivalent of the parquet pushdown, for frames already loaded.
+    if columns is not None:
+        df = df[columns]
+    if start is not None or end is not None:
+        df = df.loc[start:end]
+    if tail is not None:
+        df = df.tail(tail)
+    return df
+
+
+def read_parquet_file(path: str, columns: Optional[List[str]] = None, start: Any = None,
+                      end: Any = None, tail: Optional[int] = None) -> pd.DataFrame:
+    # Pushdown read of one cache file; raises on unreadable files.
+    parquet_file = pq.ParquetFile(path)
+    deduplicated = (parquet_file.schema_arrow.metadata or {}).get(DEDUPLICATED_KEY) == b'1'
+    groups = None
+    if start is not None or end is not None:
+        groups = date_row_groups(parquet_file, start, end, sorted_index=deduplicated)
+    elif tail is not None and deduplicated:
+        groups = tail_row_groups(parquet_file, tail)
+    if groups is None:
+        table = parquet_file.read(columns=columns, use_pandas_metadata=True)
+    else:
+        table = parquet_file.read_row_groups(groups, columns=columns, use_pandas_metadata=True)
+    df = table.to_pandas()
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    elif not isinstance(df, pd.DataFrame):
+        df = pd.DataFrame(df)
+    if not deduplicated:
+        # Files written before write-time de-duplication.
+        df = df[~df.index.duplicated(keep='first')]
+    # Pruned row groups can still hold rows just outside the range.
+    return select_rows(df, start=start, end=end, tail=tail)
+
+
+def has_cached_data(path: str = PARQUET_PATH) -> bool:
+    # True if path holds a readable, non-empty cache (an empty selection from it is a valid answer).
+    signature = file_signature(path)
+    if signature is None:
+        return False
+    with _snapshot_lock:
+        snapshot = _snapshots.get(path)
+    if snapshot is not None and snapshot[0] == signature:
+        return True
+    try:
+        return pq.ParquetFile(path).metadata.num_rows > 0
+    except (OSError, pa.ArrowException):
+        return False
+
+
+def load_cached_data(path: str = PARQUET_PATH, columns: Optional[List[str]] = None,
+                     start: Any = None, end: Any = None,
+                     tail: Optional[int] = None) -> pd.DataFrame:  # type: ignore
     """
     Load cached OHLCV data from parquet file if it exists.
+    Full reads are kept as an in-memory snapshot until the file is replaced, and
+    later reads of any selection are served from it. Without a snapshot, column
+    selection is pushed down to pyarrow and row groups outside the date range
+    are skipped using their statistics, so only the needed columns and row
+    groups are decoded; a bare tail read touches only the trailing groups.
+    If the file cannot be read, the error is logged and the last good snapshot
+    is served when there is one.
     Args:
         path (str): Path to parquet file.
+        columns (Optional[List[str]]): Columns to read; all if None.
+        start: First date to include.
+        end: Last date to include.
+        tail (Optional[int]): Keep only the last ``tail`` rows.
     Returns:
         pd.DataFrame: Loaded DataFrame or empty DataFrame if not found.
     """
-    if os.path.exists(path):
-        try:
-            df = pd.read_parquet(path)
-            if isinstance(df, pd.Series):
-                df = df.to_frame()
-            elif not isinstance(df, pd.DataFrame):
-                df = pd.DataFrame(df)
-            if df is not None and not df.empty:
-                df = pd.DataFrame(df)
-                df = df[~df.index.duplicated(keep='first')]
-                return df  # type: ignore
-        except Exception:
-            pass
-    return pd.DataFrame()
+    signature = file_signature(path)
+    if signature is None:
+        return pd.DataFrame()
+    with _snapshot_lock:
+        snapshot = _snapshots.get(path)
+    if snapshot is not None and snapshot[0] == signature:
+        # Shallow copy: callers cannot rebind columns of the shared snapshot.
+        return select_rows(snapshot[1], columns, start, end, tail).copy(deep=False)
 
+    full_read = columns is None and start is None and end is None and tail is None
+    try:
+        df = read_parquet_file(path, columns, start, end, tail)
+    except FileNotFoundError:
+        return pd.DataFrame()
+    except (OSError, pa.ArrowException) as e:
+        print(f"Could not read {path}: {e}")
+        if snapshot is None:
+            return pd.DataFrame()
+        print(f"Serving the last good snapshot of {path}")
+        return select_rows(snapshot[1], columns, start, end, tail).copy(deep=False)
 
-def get_latest_df(force_refresh: bool = False) -> pd.DataFrame:
+    # Only keep the snapshot if the file was not replaced while it was being read.
+    if full_read and not df.empty and file_signature(path) == signature:
+        with _snapshot_lock:
+            _snapshots[path] = (signature, df)
+        return df.copy(deep=False)
+    return df
+
+
+def get_latest_df(force_refresh: bool = False, symbol: str = SYMBOL,
+                  compact: Optional[bool] = None, columns: Optional[List[str]] = None,
+                  start: Any = None, end: Any = None, tail: Optional[int] = None) -> pd.DataFrame:
     """
     Get the most recent OHLCV DataFrame, loading from cache or fetching if needed.
     Args:
         force_refresh (bool): If True, always fetch fresh data.
+        symbol (str): Ticker symbol to load.
+        compact (Optional[bool]): Return float32 columns; defaults to COMPACT_MODE.
+        columns (Optional[List[str]]): Columns to return, e.g. ['Close']; all if None.
+        start: First date to return.
+        end: Last date to return.
+        tail (Optional[int]): Return only the last ``tail`` rows (after the date range).
     Returns:
         pd.DataFrame: Latest OHLCV data, date-indexed, no duplicates.
     """
+    compact = COMPACT_MODE if compact is None else compact
+    path = cache_path_for(symbol)
+    cache = get_cache()
+    key = data_cache_key(symbol)
     if not force_refresh:
-        df = load_cached_data()
+        df = cache.get(key, deserialize=df_from_parquet_bytes) if cache is not None else None
+        if df is None or df.empty:
+            if cache is None:
+                # Only the requested columns and row groups are read from disk.
+                df = load_cached_data(path, columns=columns, start=start, end=end, tail=tail)
+                selective = columns is not None or start is not None or end is not None or tail is not None
+                if not df.empty or (selective and has_cached_data(path)):
+                    # An empty selection from a readable cache is an answer, not a reason to refetch.
+                    return to_compact(df) if compact else df
+            else:
+                df = load_cached_data(path)
+                if not df.empty:
+                    # Seed the shared tiers from the packaged file so other containers skip it.
+                    cache.put(key, df, serialize=df_to_parquet_bytes)
         if not df.empty:
-            return df
-    df = fetch_ohlcv()
-    cache_data(df)
-    return df 
\ No newline at end of file
+            df = select_rows(df, columns, start, end, tail)
+            return to_compact(df) if compact else df
+    before = cache_version(path)
+    with refresh_lock(path):
+        if cache_version(path) != before:
+            # Another refresher replaced the file while this one waited for the lock.
+            df = load_cached_data(path)
+            if not df.empty:
+                df = select_rows(df, columns, start, end, tail)
+                return to_compact(df) if compact else df
+        try:
+            df = fetch_ohlcv(symbol)
+        except Exception as e:
+            print(f"Fetching {symbol} failed: {e}")
+            df = pd.DataFrame()
+        if df.empty:
+            # A failed or rate-limited fetch keeps the file, manifest and tiers; serve the last good data.
+            print(f"No data fetched for {symbol}; keeping the cached data")
+            df = load_cached_data(path)
+            if df.empty and cache is not None:
+                df = cache.get(key, deserialize=df_from_parquet_bytes)
+                df = pd.DataFrame() if df is None else df
+        elif cache is not None:
+            # An empty fetch must not overwrite the shared entry other containers read.
+            cache.put(key, df, serialize=lambda frame: df_to_parquet_bytes(to_compact(frame) if compact else frame))
+            try:
+                cache_data(df, path, compact=compact)
+            except OSError as e:
+                # On Lambda the packaged cache is read-only; the tiered cache already holds the data.
+                print(f"Could not write {path}: {e}")
+        else:
+            cache_data(df, path, compact=compact)
+    df = select_rows(df, columns, start, end, tail)
+    return to_compact(df) if compact else df
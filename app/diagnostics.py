@@ -0,0 +1,49 @@
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+DIAGNOSTICS_VERBOSE = os.getenv('DIAGNOSTICS_VERBOSE', '').lower() in ('1', 'true', 'yes')
+DIAGNOSTICS_MAX_SAMPLES = int(os.getenv('DIAGNOSTICS_MAX_SAMPLES', '5'))
+
+
+class Diagnostics:
+    """
+    Collects skip/fallback events from hot loops without printing each one.
+
+    Every event is counted by reason, and the first ``max_samples`` events per
+    reason are kept as examples. Per-event printing is opt-in through
+    ``verbose`` (or DIAGNOSTICS_VERBOSE=1); otherwise only ``log_summary``
+    writes a single line at the end of a run.
+    """
+
+    def __init__(self, name: str = 'run', max_samples: int = DIAGNOSTICS_MAX_SAMPLES,
+                 verbose: Optional[bool] = None):
+        self.name = name
+        self.max_samples = max_samples
+        self.verbose = DIAGNOSTICS_VERBOSE if verbose is None else verbose
+        self.counts: Counter = Counter()
+        self.samples: Dict[str, List[Dict[str, Any]]] = {}
+
+    def record(self, reason: str, message: str = '', **context: Any) -> None:
+        self.counts[reason] += 1
+        examples = self.samples.setdefault(reason, [])
+        if len(examples) < self.max_samples:
+            examples.append({'message': message, **context})
+        if self.verbose:
+            print(f"[{self.name}] {reason}: {message}")
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'counts': dict(self.counts),
+            'samples': {reason: list(examples) for reason, examples in self.samples.items()},
+        }
+
+    def log_summary(self) -> None:
+        if self.total:
+            counts = ', '.join(f"{reason}={count}" for reason, count in self.counts.most_common())
+            print(f"[{self.name}] {self.total} skipped/fallback events: {counts}")
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Union
+
+
+def simulate_execution(df: pd.DataFrame, targets: Union[pd.DataFrame, pd.Series],
+                       cost_bps: float = 0.0, slippage_bps: float = 0.0,
+                       max_leverage: Optional[float] = None,
+                       initial_capital: float = 1.0) -> Dict[str, pd.DataFrame]:
+    """
+    Turn target exposures into positions, turnover, costs, returns and equity in one vectorized pass.
+
+    Each column of ``targets`` is one strategy. A target set on day t is held over
+    day t+1 (the same one-day lag as ``signals.shift(1)``), so the first bar is
+    always flat. Exposures may be fractional, e.g. probability-weighted
+    signals. Costs are charged on turnover, |position_t - position_{t-1}|, at
+    ``cost_bps + slippage_bps`` per unit traded.
+    Args:
+        df (pd.DataFrame): OHLCV data; only 'Close' is used.
+        targets (Union[pd.DataFrame, pd.Series]): Target exposure per date and strategy.
+        cost_bps (float): Commission per unit of turnover, in basis points.
+        slippage_bps (float): Slippage per unit of turnover, in basis points.
+        max_leverage (Optional[float]): Clip exposures to [-max_leverage, max_leverage].
+        initial_capital (float): Starting equity.
+    Returns:
+        Dict[str, pd.DataFrame]: positions, turnover, costs, gross_returns, net_returns and equity,
+        each indexed like ``df`` with one column per strategy.
+    """
+    close_prices = df['Close']
+    if isinstance(close_prices, pd.DataFrame):
+        close_prices = close_prices.iloc[:, 0]
+    if isinstance(targets, pd.Series):
+        targets = targets.to_frame(targets.name or 'strategy')
+
+    close = close_prices.to_numpy(dtype=np.float64)
+    target = targets.reindex(close_prices.index).to_numpy(dtype=np.float64)
+    target = np.nan_to_num(target, nan=0.0)
+    if max_leverage is not None:
+        np.clip(target, -max_leverage, max_leverage, out=target)
+
+    # Day t return and the exposure decided at the close of day t-1; the first
+    # bar is flat with a zero return.
+    asset_returns = np.empty_like(close)
+    asset_returns[0] = np.nan
+    asset_returns[1:] = close[1:] / close[:-1] - 1.0
+    positions = np.zeros_like(target)
+    positions[1:] = target[:-1]
+    turnover = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    costs = turnover * (cost_bps + slippage_bps) / 1e4
+    gross = np.nan_to_num(positions * asset_returns[:, None], nan=0.0)
+    net = gross - costs
+    equity = initial_capital * np.cumprod(1.0 + net, axis=0)
+
+    index = close_prices.index
+    columns = targets.columns
+
+    def frame(values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=index, columns=columns)
+
+    return {
+        "positions": frame(positions),
+        "turnover": frame(turnover),
+        "costs": frame(costs),
+        "gross_returns": frame(gross),
+        "net_returns": frame(net),
+        "equity": frame(equity),
+    }
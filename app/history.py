@@ -0,0 +1,141 @@
+"""
+Historical regime timeline for ``/regime/history``.
+
+The current model is run once over the full history (Viterbi path plus
+forward-backward smoothed probabilities) and the path is compressed into
+runs of one regime. The timeline only changes with the data and model
+versions, so the API caches it under those and serves date-filtered,
+cursor-paginated pages from it.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .model import RegimeHMM
+
+# Positional state names of the default 3-state model, as in the latest-regime endpoints.
+REGIME_LABELS = ("bull", "bear", "sideways")
+HISTORY_DATE_FORMAT = '%Y-%m-%d'
+
+
+def state_labels(model: RegimeHMM, n_states: int, labels: Optional[Sequence[str]] = None) -> List[str]:
+    # Explicit labels (model_labels in the API) win; otherwise positional for 3 states, by mean return for others.
+    if labels is not None:
+        return list(labels)
+    if n_states == len(REGIME_LABELS):
+        return list(REGIME_LABELS)
+    return model.labels
+
+
+def normalize_date(value: Optional[str]) -> Optional[str]:
+    # Raises ValueError on unparseable input, which the API maps to a 400.
+    if value is None or value == '':
+        return None
+    return pd.Timestamp(value).strftime(HISTORY_DATE_FORMAT)
+
+
+def compress_segments(dates: List[str], states: np.ndarray,
+                      labels: Sequence[str] = REGIME_LABELS) -> List[Dict[str, Any]]:
+    """
+    Collapse a state path into runs of one regime.
+    Args:
+        dates (List[str]): Date per step.
+        states (np.ndarray): State per step.
+        labels (Sequence[str]): Label per state.
+    Returns:
+        List[Dict[str, Any]]: start, end, state, label and days per run.
+    """
+    if len(states) == 0:
+        return []
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(states)) + 1])
+    ends = np.concatenate([starts[1:] - 1, [len(states) - 1]])
+    return [
+        {
+            "start": dates[s],
+            "end": dates[e],
+            "state": int(states[s]),
+            "label": labels[int(states[s])],
+            "days": int(e - s + 1),
+        }
+        for s, e in zip(starts, ends)
+    ]
+
+
+def regime_timeline(df: pd.DataFrame, model: RegimeHMM,
+                    labels: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Decode the full history with a fitted model.
+    Args:
+        df (pd.DataFrame): Full OHLCV history.
+        model (RegimeHMM): Fitted model.
+        labels (Optional[Sequence[str]]): Label per state, as used by the latest endpoints.
+    Returns:
+        Dict[str, Any]: dates, states, probs, labels and segments over every return date.
+    """
+    index, states, probs = model.decode(df)
+    dates = [d.strftime(HISTORY_DATE_FORMAT) for d in pd.DatetimeIndex(index)]
+    n_states = probs.shape[1]
+    labels = state_labels(model, n_states, labels)
+    segments = compress_segments(dates, states, labels)
+    return {
+        "dates": np.array(dates),
+        "states": np.asarray(states),
+        "probs": np.asarray(probs),
+        "segments": segments,
+        "segment_starts": np.array([segment["start"] for segment in segments]),
+        "labels": labels,
+    }
+
+
+def page_timeline(timeline: Dict[str, Any], start: Optional[str] = None, end: Optional[str] = None,
+                  cursor: Optional[str] = None, limit: int = 500) -> Dict[str, Any]:
+    """
+    Select one page of a timeline.
+    Args:
+        timeline (Dict[str, Any]): Output of regime_timeline.
+        start (Optional[str]): First date to include (YYYY-MM-DD).
+        end (Optional[str]): Last date to include (YYYY-MM-DD).
+        cursor (Optional[str]): next_cursor from the previous page; overrides start.
+        limit (int): Maximum points per page.
+    Returns:
+        Dict[str, Any]: points, the segments clipped to the page, and next_cursor
+        (the date of the next point, or None on the last page).
+    """
+    dates = timeline["dates"]
+    lo = np.searchsorted(dates, cursor or start, side='left') if (cursor or start) else 0
+    hi = np.searchsorted(dates, end, side='right') if end else len(dates)
+    stop = min(hi, lo + limit)
+    labels = timeline["labels"]
+
+    points = [
+        {
+            "date": dates[i],
+            "state": int(timeline["states"][i]),
+            "label": labels[int(timeline["states"][i])],
+            "probabilities": [float(p) for p in timeline["probs"][i]],
+        }
+        for i in range(lo, stop)
+    ]
+
+    segments: List[Dict[str, Any]] = []
+    if points:
+        first, last = points[0]["date"], points[-1]["date"]
+        # Segment containing the first point, through the one containing the last.
+        s_lo = max(0, np.searchsorted(timeline["segment_starts"], first, side='right') - 1)
+        s_hi = np.searchsorted(timeline["segment_starts"], last, side='right')
+        for segment in timeline["segments"][s_lo:s_hi]:
+            clipped = dict(segment)
+            if clipped["start"] < first or clipped["end"] > last:
+                clipped["start"] = max(clipped["start"], first)
+                clipped["end"] = min(clipped["end"], last)
+                clipped["days"] = int(np.searchsorted(dates, clipped["end"], side='right')
+                                      - np.searchsorted(dates, clipped["start"], side='left'))
+            segments.append(clipped)
+
+    return {
+        "points": points,
+        "segments": segments,
+        "next_cursor": str(dates[stop]) if stop < hi else None,
+    }
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from fastapi import Request
+
+CACHE_MAX_AGE = int(os.getenv('CACHE_MAX_AGE', '300'))
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '64'))
+
+
+def make_etag(*parts: Any, model_version: Optional[str] = None) -> str:
+    """
+    Build a strong ETag from the values a response depends on.
+    The model version is kept readable after the data digest, so a worker
+    that has not loaded a model yet can still compare the data part.
+    Args:
+        *parts: Endpoint name, parameters and data version.
+        model_version (Optional[str]): Version of the model the body was computed with.
+    Returns:
+        str: Quoted ETag value.
+    """
+    digest = hashlib.sha1('|'.join(str(p) for p in parts).encode()).hexdigest()[:20]
+    if model_version is None:
+        return f'"{digest}"'
+    return f'"{digest}-{model_version}"'
+
+
+def etag_matches(tag: str, etag: str) -> bool:
+    # A data-only current ETag (no model loaded in this worker yet) matches any model part.
+    tag = tag.removeprefix('W/').strip('"')
+    current = etag.strip('"')
+    if tag == current:
+        return True
+    return '-' not in current and tag.split('-', 1)[0] == current
+
+
+def http_date(timestamp: Any) -> str:
+    """
+    Format a bar timestamp as an HTTP date (naive timestamps are taken as UTC).
+    Args:
+        timestamp: Anything pd.Timestamp accepts.
+    Returns:
+        str: RFC 7231 date string.
+    """
+    ts = pd.Timestamp(timestamp)
+    ts = ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+    return format_datetime(ts.to_pydatetime(), usegmt=True)
+
+
+def cache_headers(etag: str, timestamp: Any) -> Dict[str, str]:
+    return {
+        'ETag': etag,
+        'Last-Modified': http_date(timestamp),
+        'Cache-Control': f'public, max-age={CACHE_MAX_AGE}',
+    }
+
+
+def is_not_modified(request: Request, etag: str, timestamp: Any, model_dependent: bool = False) -> bool:
+    """
+    Check conditional request headers against the current representation.
+    If-None-Match takes precedence over If-Modified-Since (RFC 7232).
+    Args:
+        request (Request): Incoming request.
+        etag (str): Current ETag.
+        timestamp: Current last bar timestamp.
+        model_dependent (bool): The body also depends on the model. A refit on the
+            same bar changes it without changing the bar time, so If-Modified-Since
+            is not trusted and only the ETag validates.
+    Returns:
+        bool: True if a 304 can be returned.
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or any(etag_matches(tag, etag) for tag in tags)
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is not None and not model_dependent:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return parsedate_to_datetime(http_date(timestamp)) <= since
+    return False
+
+
+class ResponseCache:
+    """Small thread-safe LRU of response bodies keyed by ETag."""
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,246 @@
+"""
+HTTP load-test harness for the API.
+
+Drives the FastAPI app either in-process (httpx ASGI transport) or through a
+local uvicorn server, at a fixed concurrency for a fixed duration, against a
+synthetic data fixture. Reports cold-start latency, throughput and
+p50/p95/p99 latency per endpoint, and writes JSON that can be compared with an
+earlier run:
+
+    python -m app.loadtest --concurrency 16 --duration 20 --output results.json
+    python -m app.loadtest --mode uvicorn --baseline results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from . import data_loader
+from .cache import get_cache
+from .synthetic import generate_ohlcv, write_universe
+
+DEFAULT_ENDPOINTS = ["/regime/latest", "/signal/latest"]
+
+
+@contextmanager
+def prepare_fixture(directory: Optional[str] = None, n_days: int = 2520, seed: int = 0) -> Iterator[str]:
+    """
+    Write a synthetic default-symbol cache and point data_loader at it until the block exits.
+    Args:
+        directory (Optional[str]): Cache directory; a temporary one, removed on exit, if omitted.
+        n_days (int): Bars of synthetic history.
+        seed (int): Generator seed.
+    Returns:
+        Iterator[str]: The fixture directory.
+    """
+    temporary = directory is None
+    directory = directory or tempfile.mkdtemp(prefix='loadtest_')
+    previous_path = data_loader.PARQUET_PATH
+    try:
+        write_universe({data_loader.SYMBOL: generate_ohlcv(n_days, seed=seed)}, directory)
+        data_loader.PARQUET_PATH = os.path.join(directory, os.path.basename(previous_path))
+        yield directory
+    finally:
+        data_loader.PARQUET_PATH = previous_path
+        if temporary:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def reset_app_state() -> None:
+    # Drop fitted models, loaded data and cached responses so the next request is a cold start.
+    from . import api
+    api.hmm_model = None
+    api.symbol_models.clear()
+    api.indicator_states.clear()
+    api.artifact_readers.clear()
+    api.cold_symbols.clear()
+    api.missing_symbols.clear()
+    api.response_cache.clear()
+    api.history_cache.clear()
+    with data_loader._snapshot_lock:
+        data_loader._snapshots.clear()
+    cache = get_cache()
+    if cache is not None:
+        cache.clear()
+
+
+async def measure_cold_start(client: httpx.AsyncClient, endpoints: List[str]) -> Dict[str, float]:
+    cold: Dict[str, float] = {}
+    for endpoint in endpoints:
+        started = time.perf_counter()
+        await client.get(endpoint)
+        cold[endpoint] = (time.perf_counter() - started) * 1000
+    return cold
+
+
+async def run_load(client: httpx.AsyncClient, endpoints: List[str], concurrency: int,
+                   duration: float, conditional: bool = False) -> List[Tuple[str, float, int]]:
+    """
+    Hammer the endpoints from ``concurrency`` workers for ``duration`` seconds.
+    Args:
+        client (httpx.AsyncClient): Client bound to the app or server.
+        endpoints (List[str]): Paths to request round-robin.
+        concurrency (int): Number of concurrent workers.
+        duration (float): Seconds to run.
+        conditional (bool): Send If-None-Match with the last ETag seen, like a polling dashboard.
+    Returns:
+        List[Tuple[str, float, int]]: (endpoint, latency in ms, status code) per request.
+    """
+    samples: List[Tuple[str, float, int]] = []
+    etags: Dict[str, str] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int) -> None:
+        n = offset
+        while time.perf_counter() < deadline:
+            endpoint = endpoints[n % len(endpoints)]
+            n += 1
+            headers = {'If-None-Match': etags[endpoint]} if conditional and endpoint in etags else {}
+            started = time.perf_counter()
+            try:
+                response = await client.get(endpoint, headers=headers)
+                status = response.status_code
+                if 'etag' in response.headers:
+                    etags[endpoint] = response.headers['etag']
+            except httpx.HTTPError:
+                status = 0
+            samples.append((endpoint, (time.perf_counter() - started) * 1000, status))
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return samples
+
+
+def summarize(samples: List[Tuple[str, float, int]], duration: float,
+              cold_start: Dict[str, float]) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    for endpoint in sorted({s[0] for s in samples} | set(cold_start)):
+        latencies = np.array([s[1] for s in samples if s[0] == endpoint])
+        statuses = [s[2] for s in samples if s[0] == endpoint]
+        errors = sum(1 for status in statuses if status == 0 or status >= 400)
+        stats: Dict[str, Any] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "not_modified": statuses.count(304),
+            "throughput_rps": len(latencies) / duration if duration > 0 else 0.0,
+            "cold_start_ms": cold_start.get(endpoint),
+        }
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            stats.update({
+                "mean_ms": float(latencies.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(latencies.max()),
+            })
+        report[endpoint] = stats
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """
+    List endpoints whose p95 latency rose or throughput fell by more than ``max_regression``.
+    """
+    regressions = []
+    for endpoint, stats in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before or "p95_ms" not in stats or "p95_ms" not in before:
+            continue
+        if stats["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{endpoint}: p95 {before['p95_ms']:.1f} -> {stats['p95_ms']:.1f} ms")
+        if stats["throughput_rps"] < before["throughput_rps"] * (1 - max_regression):
+            regressions.append(f"{endpoint}: throughput {before['throughput_rps']:.1f} -> "
+                               f"{stats['throughput_rps']:.1f} req/s")
+    return regressions
+
+
+async def run_inprocess(args: argparse.Namespace) -> Dict[str, Any]:
+    from .api import app
+    with prepare_fixture(args.fixture_dir, args.days):
+        reset_app_state()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            cold = await measure_cold_start(client, args.endpoints)
+            samples = await run_load(client, args.endpoints, args.concurrency, args.duration, args.conditional)
+    return summarize(samples, args.duration, cold)
+
+
+async def run_uvicorn(args: argparse.Namespace) -> Dict[str, Any]:
+    with prepare_fixture(args.fixture_dir, args.days) as fixture:
+        env = dict(os.environ, DATA_CACHE_DIR=fixture)
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.api:app", "--port", str(args.port), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+                for _ in range(200):
+                    try:
+                        if (await client.get("/health")).status_code == 200:
+                            break
+                    except httpx.HTTPError:
+                        await asyncio.sleep(0.05)
+                else:
+                    raise RuntimeError("uvicorn did not become healthy")
+                cold = await measure_cold_start(client, args.endpoints)
+                samples = await run_load(client, args.endpoints, args.concurrency, args.duration, args.conditional)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+        return summarize(samples, args.duration, cold)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the trading engine API.")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--endpoints", nargs="+", default=DEFAULT_ENDPOINTS)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of sustained load")
+    parser.add_argument("--conditional", action="store_true", help="Revalidate with If-None-Match")
+    parser.add_argument("--days", type=int, default=2520, help="Bars in the synthetic fixture")
+    parser.add_argument("--fixture-dir", default=None)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON results to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    runner = run_inprocess if args.mode == "inprocess" else run_uvicorn
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "endpoints": asyncio.run(runner(args)),
+    }
+
+    for endpoint, stats in report["endpoints"].items():
+        print(f"{endpoint}: {stats['requests']} req, {stats['throughput_rps']:.1f} req/s, "
+              f"p50 {stats.get('p50_ms', float('nan')):.2f} ms, p95 {stats.get('p95_ms', float('nan')):.2f} ms, "
+              f"p99 {stats.get('p99_ms', float('nan')):.2f} ms, cold start {stats['cold_start_ms']:.0f} ms, "
+              f"errors {stats['errors']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,54 +2,113 @@ import numpy as np
 import pandas as pd
 from hmmlearn.hmm import GaussianHMM
 import pickle
+import hashlib
 import os
-from typing import Optional
+from typing import List, Optional, Tuple
+
+from .cache import TieredCache, get_cache
+from .diagnostics import Diagnostics
 
 MODEL_PATH = '/tmp/model.pkl'
 
+
+def model_path_for(symbol: str) -> str:
+    return os.path.join(os.path.dirname(MODEL_PATH), f'model_{symbol}.pkl')
+
+
+def data_version(df: pd.DataFrame) -> str:
+    # A fit is determined by the data it saw, so identify data by its last bar and length.
+    return f"{pd.Timestamp(df.index[-1]).strftime('%Y%m%d')}_{len(df)}"
+
+
+def model_cache_key(symbol: str, df: pd.DataFrame, n_states: int = 3, covariance_type: str = 'full') -> str:
+    suffix = '' if covariance_type == 'full' else f'_{covariance_type}'
+    return f'model/{symbol}/{n_states}{suffix}_{data_version(df)}.pkl'
+
+
+def label_states(means: np.ndarray) -> List[str]:
+    """
+    Name states by mean return: highest is 'bull', lowest is 'bear', the rest 'sideways'.
+    Args:
+        means (np.ndarray): Mean log return per state.
+    Returns:
+        List[str]: Label per state.
+    """
+    order = np.argsort(np.asarray(means).ravel())
+    labels = ['sideways'] * len(order)
+    labels[order[-1]] = 'bull'
+    labels[order[0]] = 'bear'
+    return labels
+
 class RegimeHMM:
-    def __init__(self, n_states: int = 3):
+    def __init__(self, n_states: int = 3, diagnostics: Optional[Diagnostics] = None,
+                 covariance_type: str = 'full'):
         self.n_states = n_states
+        self.covariance_type = covariance_type
+        # Standalone models (API, refresh) log every fit failure and fallback as it happens;
+        # the backtest passes its own collector, which only counts per-day events.
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics('HMM', verbose=True)
         self.model: Optional[GaussianHMM] = None
+        self._version: Optional[str] = None
 
     def fit(self, df: pd.DataFrame, n_states: Optional[int] = None) -> None:
         n_states = n_states or self.n_states
+        self._version = None
         close_prices = df['Close']
         if isinstance(close_prices, pd.DataFrame):
             close_prices = close_prices.iloc[:, 0]
-        close_prices = close_prices.dropna()
+        # Compact (float32) data is upcast here: EM needs float64 log returns.
+        close_prices = close_prices.dropna().astype(np.float64)
         if len(close_prices) < 100:
             # No exception, just skip fitting.
-            print("[HMM fit] Insufficient data for HMM fitting (need 100, got %d). Skipping." % len(close_prices))
+            self.diagnostics.record('fit_insufficient_prices',
+                                    "Insufficient data for HMM fitting (need 100, got %d). Skipping." % len(close_prices),
+                                    n_prices=len(close_prices))
             self.model = None
             return
 
         log_prices = np.log(close_prices)
         returns_series = pd.Series(log_prices, index=close_prices.index).diff().dropna()
+        self.fit_returns(returns_series.values, n_states)
+
+    def fit_returns(self, returns: np.ndarray, n_states: Optional[int] = None) -> None:
+        # Fit on precomputed daily log returns; NaNs are dropped like Series.dropna().
+        n_states = n_states or self.n_states
+        self._version = None
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[~np.isnan(returns)]
 
-        if len(returns_series) < 50:
-            print("[HMM fit] Insufficient returns data for HMM fitting (need 50, got %d). Skipping." % len(returns_series))
+        if len(returns) < 50:
+            self.diagnostics.record('fit_insufficient_returns',
+                                    "Insufficient returns data for HMM fitting (need 50, got %d). Skipping." % len(returns),
+                                    n_returns=len(returns))
             self.model = None
             return
 
-        returns = returns_series.values.reshape(-1, 1)
+        returns = returns.reshape(-1, 1)
         if np.isnan(returns).any() or np.isinf(returns).any():
-            print("[HMM fit] Invalid returns data (NaN or Inf). Skipping.")
+            self.diagnostics.record('fit_invalid_returns', "Invalid returns data (NaN or Inf). Skipping.")
             self.model = None
             return
 
         self.model = GaussianHMM(
             n_components=n_states,
-            covariance_type='full',
+            covariance_type=self.covariance_type,
             n_iter=1000,
             random_state=42
         )
         self.model.fit(returns)
 
+    @property
+    def labels(self) -> List[str]:
+        # States named by mean return; an unfitted model predicts uniform probabilities anyway.
+        means = self.model.means_[:, 0] if self.model is not None else np.zeros(self.n_states)
+        return label_states(means)
+
     def predict_proba(self, df_tail: pd.DataFrame) -> np.ndarray:
         # Always return a valid probability vector.
         if self.model is None:
-            print("[predict_proba] Model not fitted, returning uniform probs.")
+            self.diagnostics.record('predict_unfitted', "Model not fitted, returning uniform probs.")
             return np.array([1.0/self.n_states] * self.n_states)
 
         close_prices_tail = df_tail['Close']
@@ -58,23 +117,65 @@ class RegimeHMM:
 
         # Must have at least 2 data points for a return.
         if len(close_prices_tail.dropna()) < 2:
-            print("[predict_proba] Not enough data for returns, returning uniform probs.")
+            self.diagnostics.record('predict_insufficient_data', "Not enough data for returns, returning uniform probs.")
             return np.array([1.0/self.n_states] * self.n_states)
 
-        log_prices_tail = np.log(close_prices_tail.dropna())
+        log_prices_tail = np.log(close_prices_tail.dropna().astype(np.float64))
         log_returns_tail_series = pd.Series(log_prices_tail, index=close_prices_tail.dropna().index).diff().dropna()
         if len(log_returns_tail_series) == 0:
-            print("[predict_proba] Not enough data for returns (diff empty), returning uniform probs.")
+            self.diagnostics.record('predict_empty_returns',
+                                    "Not enough data for returns (diff empty), returning uniform probs.")
             return np.array([1.0/self.n_states] * self.n_states)
 
-        log_returns_tail = log_returns_tail_series.values.reshape(-1, 1)
+        return self.predict_proba_returns(log_returns_tail_series.values)
+
+    def predict_proba_returns(self, returns: np.ndarray) -> np.ndarray:
+        # Latest-state probabilities from precomputed log returns; uniform on any failure.
+        if self.model is None:
+            self.diagnostics.record('predict_unfitted', "Model not fitted, returning uniform probs.")
+            return np.array([1.0/self.n_states] * self.n_states)
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[~np.isnan(returns)]
+        if len(returns) == 0:
+            self.diagnostics.record('predict_empty_returns',
+                                    "Not enough data for returns (diff empty), returning uniform probs.")
+            return np.array([1.0/self.n_states] * self.n_states)
         try:
-            probs = self.model.predict_proba(log_returns_tail)
+            probs = self.model.predict_proba(returns.reshape(-1, 1))
             return probs[-1]
         except Exception as e:
-            print(f"[predict_proba] Exception: {e}. Returning uniform probs.")
+            self.diagnostics.record('predict_exception', f"Exception: {e}. Returning uniform probs.")
             return np.array([1.0/self.n_states] * self.n_states)
 
+    def decode(self, df: pd.DataFrame) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+        """
+        One Viterbi and one forward-backward pass over the whole history.
+        Returns:
+            Tuple: return dates, most likely state per date, smoothed probabilities (n, n_states).
+        """
+        if self.model is None:
+            raise ValueError('Model not fitted.')
+        close_prices = df['Close']
+        if isinstance(close_prices, pd.DataFrame):
+            close_prices = close_prices.iloc[:, 0]
+        close_prices = close_prices.dropna().astype(np.float64)
+        returns_series = pd.Series(np.log(close_prices), index=close_prices.index).diff().dropna()
+        returns = returns_series.values.reshape(-1, 1)
+        _, states = self.model.decode(returns, algorithm='viterbi')
+        probs = self.model.predict_proba(returns)
+        return returns_series.index, states, probs
+
+    def version(self) -> str:
+        # Fingerprint of the fitted parameters; stable across processes for the same fit.
+        if self.model is None:
+            return 'unfitted'
+        if self._version is None:
+            h = hashlib.sha1()
+            for name in ('startprob_', 'transmat_', 'means_', 'covars_'):
+                h.update(np.ascontiguousarray(getattr(self.model, name), dtype=np.float64).tobytes())
+            self._version = h.hexdigest()[:12]
+        return self._version
+
     def save(self, path: str = MODEL_PATH) -> None:
         if self.model is None:
             raise ValueError('Model not fitted.')
@@ -84,3 +185,22 @@ class RegimeHMM:
     def load(self, path: str = MODEL_PATH) -> None:
         with open(path, 'rb') as f:
             self.model = pickle.load(f)
+        self._version = None
+
+    def load_cached(self, key: str, cache: Optional[TieredCache] = None) -> bool:
+        # Read-through from the tiered cache; False when disabled or missing.
+        cache = cache if cache is not None else get_cache()
+        if cache is None:
+            return False
+        model = cache.get(key, deserialize=pickle.loads)
+        if model is None:
+            return False
+        self.model = model
+        self._version = None
+        return True
+
+    def save_cached(self, key: str, cache: Optional[TieredCache] = None) -> None:
+        cache = cache if cache is not None else get_cache()
+        if cache is None or self.model is None:
+            return
+        cache.put(key, self.model, serialize=pickle.dumps)
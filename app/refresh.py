@@ -0,0 +1,169 @@
+"""
+Scheduled refresh job that precomputes the latest regime and signal per symbol.
+
+Run from cron (``python -m app.refresh --symbols SPY QQQ``) or as a scheduled
+Lambda (``refresh.lambda_handler``). Each run pulls new bars, refits or loads
+the model, and writes one snapshot per symbol to the configured SnapshotStore
+so the API can serve ``/regime/latest`` and ``/signal/latest`` without
+touching the model.
+"""
+
+import argparse
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .data_loader import SYMBOL, get_latest_df
+from .model import RegimeHMM, model_cache_key, model_path_for
+from .snapshots import SnapshotStore, get_snapshot_store
+from .selection import MODEL_SELECTION, fit_selected_model, model_labels
+from .strategies import IndicatorState, aggregate_regime_probs
+
+
+def compute_snapshot(symbol: str, df: pd.DataFrame, model: RegimeHMM) -> Dict[str, Any]:
+    """
+    Compute the latest regime probabilities and signal for one symbol.
+    Args:
+        symbol (str): Ticker symbol.
+        df (pd.DataFrame): Full OHLCV history.
+        model (RegimeHMM): Fitted model.
+    Returns:
+        Dict[str, Any]: Snapshot item ready for a SnapshotStore.
+    """
+    # Same windows as the live endpoints: 30 days for inference, 200 for strategies.
+    labels = model_labels(model)
+    state_probs = model.predict_proba(df.tail(30))
+    probs = aggregate_regime_probs(state_probs, labels)
+    indicators = IndicatorState.from_df(df)
+    signal_data = indicators.signal(probs)
+    snapshot = {
+        "symbol": symbol,
+        "timestamp": str(df.index[-1]),
+        "regime_probs": [float(p) for p in probs],
+        "signal": signal_data,
+        "model_version": model.version(),
+        # Lets a consumer resume per-tick signals from this snapshot.
+        "indicators": indicators.to_dict(),
+        "computed_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if labels is not None:
+        # Selected models can have any state count; keep the per-state view as well.
+        snapshot["state_labels"] = labels
+        snapshot["state_probs"] = [float(p) for p in state_probs]
+    return snapshot
+
+
+def load_or_fit_model(symbol: str, df: pd.DataFrame, refit: bool = True) -> RegimeHMM:
+    """
+    Fit the symbol's model on df, or reuse a saved one.
+    Args:
+        symbol (str): Ticker symbol.
+        df (pd.DataFrame): Full OHLCV history.
+        refit (bool): If False, reuse a previously saved model when available.
+    Returns:
+        RegimeHMM: Fitted model.
+    """
+    if MODEL_SELECTION:
+        # The selection and the selected fit are cached per data version. Offline, so the
+        # candidates are fitted in parallel and the API then reads the cached result.
+        return fit_selected_model(df, symbol, n_jobs=os.cpu_count() or 1)
+
+    model = RegimeHMM(n_states=3)
+    path = model_path_for(symbol)
+    key = model_cache_key(symbol, df)
+    loaded = False
+    if not refit:
+        loaded = model.load_cached(key)
+        if not loaded and os.path.exists(path):
+            model.load(path)
+            loaded = True
+    if not loaded:
+        model.fit(df)
+        if model.model is not None:
+            model.save(path)
+            # Publish to the shared tier so API containers load instead of refitting.
+            model.save_cached(key)
+    return model
+
+
+def refresh_symbol(symbol: str, store: SnapshotStore, refit: bool = True) -> Dict[str, Any]:
+    """
+    Refresh data, model and snapshot for a single symbol.
+    Args:
+        symbol (str): Ticker symbol.
+        store (SnapshotStore): Destination store.
+        refit (bool): If False, reuse a previously saved model when available.
+    Returns:
+        Dict[str, Any]: The snapshot that was written.
+    """
+    df = get_latest_df(force_refresh=True, symbol=symbol)
+    if df.empty:
+        raise ValueError(f"No data available for {symbol}")
+
+    model = load_or_fit_model(symbol, df, refit=refit)
+    snapshot = compute_snapshot(symbol, df, model)
+    store.put_item(snapshot)
+    return snapshot
+
+
+def refresh_snapshots(symbols: Optional[List[str]] = None,
+                      store: Optional[SnapshotStore] = None,
+                      refit: bool = True) -> Dict[str, Any]:
+    """
+    Refresh snapshots for every requested symbol, isolating per-symbol failures.
+    Args:
+        symbols (Optional[List[str]]): Symbols to refresh; defaults to SYMBOL.
+        store (Optional[SnapshotStore]): Destination store; defaults to the configured one.
+        refit (bool): If False, reuse saved models when available.
+    Returns:
+        Dict[str, Any]: Refreshed snapshot timestamps and per-symbol errors.
+    """
+    symbols = symbols or [SYMBOL]
+    if store is None:
+        store = get_snapshot_store() or get_snapshot_store('sqlite')
+
+    updated: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+    for symbol in symbols:
+        try:
+            snapshot = refresh_symbol(symbol, store, refit=refit)
+            updated[symbol] = snapshot["timestamp"]
+        except Exception as e:
+            print(f"[refresh] {symbol} failed: {e}")
+            errors[symbol] = str(e)
+    return {"updated": updated, "errors": errors}
+
+
+def lambda_handler(event, context):
+    """
+    Scheduled Lambda entry point.
+    Args:
+        event: Schedule event, optionally carrying ``symbols`` and ``refit``.
+        context: Lambda context object.
+    Returns:
+        dict: Refresh summary.
+    """
+    event = event or {}
+    symbols = event.get("symbols") or os.getenv("REFRESH_SYMBOLS", SYMBOL).split(",")
+    return refresh_snapshots(symbols, refit=event.get("refit", True))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute regime/signal snapshots.")
+    parser.add_argument("--symbols", nargs="+", default=[SYMBOL])
+    parser.add_argument("--store", default=None, help="Snapshot store backend (sqlite or dynamodb)")
+    parser.add_argument("--no-refit", action="store_true", help="Reuse saved models when available")
+    args = parser.parse_args()
+
+    store = get_snapshot_store(args.store) if args.store else None
+    result = refresh_snapshots(args.symbols, store=store, refit=not args.no_refit)
+    for symbol, timestamp in result["updated"].items():
+        print(f"{symbol}: snapshot at {timestamp}")
+    for symbol, error in result["errors"].items():
+        print(f"{symbol}: FAILED ({error})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Model-order selection for the regime HMM.
+
+Fits every candidate (state count, covariance type) on the first part of a
+symbol's daily log returns, in parallel, and scores each by BIC and AIC on
+the training data and by log-likelihood per observation on the held-out
+tail. The winning configuration is cached per symbol and data version (in
+process and, when enabled, in the tiered cache), and refitted on the full
+history. With MODEL_SELECTION enabled the API and refresh job use the
+selected model and label its states by mean return, so the strategy mapping
+works for any state count.
+
+Observations are one-dimensional, so 'full', 'diag' and 'spherical' are the
+same model; 'tied' (one variance shared by all states) is the meaningful
+alternative.
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from hmmlearn.hmm import GaussianHMM
+
+from .cache import get_cache
+from .model import RegimeHMM, data_version, model_cache_key
+
+MODEL_SELECTION = os.getenv('MODEL_SELECTION', '').lower() in ('1', 'true', 'yes')
+CANDIDATE_STATES = (2, 3, 4)
+CANDIDATE_COVARIANCE_TYPES = ('full', 'tied')
+CRITERIA = ('bic', 'aic', 'test_log_likelihood')
+SELECTION_TEST_FRACTION = 0.2
+# Worker processes for the candidate fits. In-process by default, because the API selects
+# inside request handlers (threads under uvicorn, single-core on Lambda); the refresh job
+# and the production supervisor pass the CPU count.
+SELECTION_JOBS = int(os.getenv('SELECTION_JOBS', '1'))
+
+_selection_cache: Dict[str, Dict[str, Any]] = {}
+_selection_lock = threading.Lock()
+
+
+def log_returns(df: pd.DataFrame) -> np.ndarray:
+    close_prices = df['Close']
+    if isinstance(close_prices, pd.DataFrame):
+        close_prices = close_prices.iloc[:, 0]
+    close_prices = close_prices.dropna().astype(np.float64)
+    return np.diff(np.log(close_prices.to_numpy())).reshape(-1, 1)
+
+
+def score_candidate(train: np.ndarray, test: np.ndarray, n_states: int,
+                    covariance_type: str) -> Dict[str, Any]:
+    """
+    Fit one candidate and score it.
+    Returns:
+        Dict[str, Any]: Configuration, training log-likelihood, BIC, AIC and
+        held-out log-likelihood per observation, or an error message.
+    """
+    result: Dict[str, Any] = {"n_states": n_states, "covariance_type": covariance_type}
+    try:
+        model = GaussianHMM(n_components=n_states, covariance_type=covariance_type,
+                            n_iter=1000, random_state=42)
+        model.fit(train)
+        result.update({
+            "log_likelihood": float(model.score(train)),
+            "bic": float(model.bic(train)),
+            "aic": float(model.aic(train)),
+            "test_log_likelihood": float(model.score(test) / len(test)),
+            "converged": bool(model.monitor_.converged),
+        })
+        if not all(np.isfinite(result[k]) for k in ("bic", "aic", "test_log_likelihood")):
+            result["error"] = "non-finite score"
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def is_better(candidate: Dict[str, Any], best: Optional[Dict[str, Any]], criterion: str) -> bool:
+    if best is None:
+        return True
+    # Information criteria are minimized, held-out likelihood maximized.
+    if criterion == "test_log_likelihood":
+        return candidate[criterion] > best[criterion]
+    return candidate[criterion] < best[criterion]
+
+
+def selection_key(symbol: str, df: pd.DataFrame, state_counts: Sequence[int],
+                  covariance_types: Sequence[str], criterion: str) -> str:
+    grid = '-'.join(str(n) for n in state_counts) + '_' + '-'.join(covariance_types)
+    return f'selection/{symbol}/{data_version(df)}_{criterion}_{grid}.json'
+
+
+def select_model_order(df: pd.DataFrame, symbol: Optional[str] = None,
+                       state_counts: Sequence[int] = CANDIDATE_STATES,
+                       covariance_types: Sequence[str] = CANDIDATE_COVARIANCE_TYPES,
+                       criterion: str = 'bic', test_fraction: float = SELECTION_TEST_FRACTION,
+                       n_jobs: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Score every candidate configuration and pick the best.
+    Args:
+        df (pd.DataFrame): OHLCV history.
+        symbol (Optional[str]): Ticker; when given, the result is cached per symbol and data version.
+        state_counts (Sequence[int]): Candidate numbers of states (at least 2).
+        covariance_types (Sequence[str]): Candidate hmmlearn covariance types.
+        criterion (str): 'bic', 'aic' or 'test_log_likelihood'.
+        test_fraction (float): Share of the most recent returns held out.
+        n_jobs (Optional[int]): Worker processes; defaults to SELECTION_JOBS, 1 runs in-process.
+    Returns:
+        Dict[str, Any]: 'best' configuration, every scored 'candidates' entry and the 'criterion'.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"criterion must be one of {CRITERIA}")
+    if min(state_counts) < 2:
+        raise ValueError("Candidate state counts must be at least 2")
+
+    key = selection_key(symbol, df, state_counts, covariance_types, criterion) if symbol else None
+    if key is not None:
+        with _selection_lock:
+            cached = _selection_cache.get(key)
+        if cached is None and get_cache() is not None:
+            cached = get_cache().get(key, deserialize=json.loads)
+        if cached is not None:
+            return cached
+
+    returns = log_returns(df)
+    n_test = int(len(returns) * test_fraction)
+    if len(returns) - n_test < 50 or n_test < 10:
+        raise ValueError(f"Insufficient data for model selection ({len(returns)} returns)")
+    train, test = returns[:-n_test], returns[-n_test:]
+
+    grid = [(n, c) for n in state_counts for c in covariance_types]
+    n_jobs = n_jobs or SELECTION_JOBS
+    if n_jobs == 1 or len(grid) == 1:
+        candidates = [score_candidate(train, test, n, c) for n, c in grid]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(grid))) as executor:
+            candidates = list(executor.map(score_candidate, [train] * len(grid), [test] * len(grid),
+                                           *zip(*grid)))
+
+    best = None
+    for candidate in candidates:
+        if "error" not in candidate and is_better(candidate, best, criterion):
+            best = candidate
+    if best is None:
+        raise ValueError("No candidate model could be fitted")
+
+    result = {"best": best, "candidates": candidates, "criterion": criterion}
+    if key is not None:
+        with _selection_lock:
+            _selection_cache[key] = result
+        if get_cache() is not None:
+            get_cache().put(key, result, serialize=lambda r: json.dumps(r).encode())
+    return result
+
+
+def fit_selected_model(df: pd.DataFrame, symbol: Optional[str] = None, **kwargs) -> RegimeHMM:
+    """
+    Select a configuration and fit it on the full history.
+    Args:
+        df (pd.DataFrame): OHLCV history.
+        symbol (Optional[str]): Ticker, for caching the selection and the fit.
+        **kwargs: Passed to select_model_order.
+    Returns:
+        RegimeHMM: Model fitted with the selected state count and covariance type.
+    """
+    best = select_model_order(df, symbol=symbol, **kwargs)["best"]
+    model = RegimeHMM(n_states=best["n_states"], covariance_type=best["covariance_type"])
+    key = model_cache_key(symbol, df, best["n_states"], best["covariance_type"]) if symbol else None
+    if key is None or not model.load_cached(key):
+        model.fit(df)
+        if key is not None:
+            model.save_cached(key)
+    return model
+
+
+def model_labels(model: RegimeHMM) -> Optional[List[str]]:
+    # Only selected models are labelled; the default model keeps positional bull/bear/sideways.
+    if not MODEL_SELECTION:
+        return None
+    return model.labels
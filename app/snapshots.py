@@ -0,0 +1,138 @@
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+SNAPSHOT_STORE = os.getenv('SNAPSHOT_STORE', '')
+SNAPSHOT_DB_PATH = os.getenv('SNAPSHOT_DB_PATH', '/tmp/snapshots.db')
+DYNAMODB_TABLE = os.getenv('DYNAMODB_TABLE', 'trading-data-cache')
+SNAPSHOT_TTL_SECONDS = int(os.getenv('SNAPSHOT_TTL_SECONDS', str(7 * 24 * 3600)))
+
+
+class SnapshotStore(ABC):
+    """
+    Key-value store for precomputed per-symbol regime/signal snapshots.
+
+    Items are flat dicts keyed by ``symbol`` with a ``timestamp`` of the last
+    bar they were computed from, mirroring the DynamoDB item model so any
+    backend can be swapped in without touching the API.
+    """
+
+    @abstractmethod
+    def put_item(self, item: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def get_item(self, symbol: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    def batch_get_items(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        items = {}
+        for symbol in symbols:
+            item = self.get_item(symbol)
+            if item is not None:
+                items[symbol] = item
+        return items
+
+
+class SQLiteSnapshotStore(SnapshotStore):
+    """Local SQLite backend holding the latest snapshot per symbol."""
+
+    def __init__(self, path: str = SNAPSHOT_DB_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS snapshots ('
+                'symbol TEXT PRIMARY KEY, timestamp TEXT NOT NULL, body TEXT NOT NULL)'
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A sqlite3 connection's own context manager only commits or rolls back; closing() releases it.
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def put_item(self, item: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO snapshots (symbol, timestamp, body) VALUES (?, ?, ?)',
+                (item['symbol'], item['timestamp'], json.dumps(item)),
+            )
+
+    def get_item(self, symbol: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT body FROM snapshots WHERE symbol = ?', (symbol,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def batch_get_items(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        placeholders = ','.join('?' * len(symbols))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT symbol, body FROM snapshots WHERE symbol IN ({placeholders})', symbols
+            ).fetchall()
+        return {symbol: json.loads(body) for symbol, body in rows}
+
+
+class DynamoDBSnapshotStore(SnapshotStore):
+    """
+    DynamoDB backend for the ``trading-data-cache`` table (hash key ``symbol``,
+    range key ``timestamp``). The newest item per symbol is the current snapshot;
+    older ones expire through the table's ``ttl`` attribute.
+    """
+
+    def __init__(self, table_name: str = DYNAMODB_TABLE, table: Any = None):
+        if table is None:
+            import boto3
+            table = boto3.resource('dynamodb').Table(table_name)
+        self.table = table
+
+    def put_item(self, item: Dict[str, Any]) -> None:
+        item = json.loads(json.dumps(item), parse_float=Decimal)
+        item['ttl'] = int(time.time()) + SNAPSHOT_TTL_SECONDS
+        self.table.put_item(Item=item)
+
+    def get_item(self, symbol: str) -> Optional[Dict[str, Any]]:
+        from boto3.dynamodb.conditions import Key
+        response = self.table.query(
+            KeyConditionExpression=Key('symbol').eq(symbol),
+            ScanIndexForward=False,
+            Limit=1,
+        )
+        items = response.get('Items', [])
+        if not items:
+            return None
+        item = json.loads(json.dumps(items[0], default=_decimal_default))
+        item.pop('ttl', None)
+        return item
+
+
+def _decimal_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def get_snapshot_store(backend: Optional[str] = None) -> Optional[SnapshotStore]:
+    """
+    Build the configured snapshot store.
+    Args:
+        backend (Optional[str]): 'sqlite' or 'dynamodb'; defaults to SNAPSHOT_STORE.
+    Returns:
+        Optional[SnapshotStore]: Store instance, or None if snapshots are disabled.
+    """
+    backend = (backend if backend is not None else SNAPSHOT_STORE).lower()
+    if backend == 'sqlite':
+        return SQLiteSnapshotStore()
+    if backend == 'dynamodb':
+        return DynamoDBSnapshotStore()
+    if backend:
+        raise ValueError(f"Unknown snapshot store '{backend}'")
+    return None
@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence
+
+REGIME_NAMES = ("bull", "bear", "sideways")
 
 def calculate_ma_crossover(df: pd.DataFrame, short_window: int = 50, long_window: int = 200) -> float:
     if len(df) < long_window:
@@ -33,8 +35,7 @@ def calculate_rsi(df: pd.DataFrame, window: int = 14) -> float:
 def bull_strategy(df: pd.DataFrame) -> float:
     return calculate_ma_crossover(df, 50, 200)
 
-def bear_strategy(df: pd.DataFrame) -> float:
-    rsi = calculate_rsi(df, 14)
+def rsi_signal(rsi: float) -> float:
     if rsi < 30:
         return 1.0
     elif rsi > 70:
@@ -42,15 +43,16 @@ def bear_strategy(df: pd.DataFrame) -> float:
     else:
         return 0.0
 
+def bear_strategy(df: pd.DataFrame) -> float:
+    return rsi_signal(calculate_rsi(df, 14))
+
 def sideways_strategy(df: pd.DataFrame) -> float:
     return 0.0
 
-def generate_signal(regime_probs: np.ndarray, df: pd.DataFrame) -> Dict[str, Any]:
+def combine_signals(regime_probs: np.ndarray, bull_signal: float, bear_signal: float,
+                    sideways_signal: float) -> Dict[str, Any]:
     if len(regime_probs) != 3:
         raise ValueError("Expected 3 regime probabilities")
-    bull_signal = bull_strategy(df)
-    bear_signal = bear_strategy(df)
-    sideways_signal = sideways_strategy(df)
     weighted_signal = (
         regime_probs[0] * bull_signal +
         regime_probs[1] * bear_signal +
@@ -68,6 +70,253 @@ def generate_signal(regime_probs: np.ndarray, df: pd.DataFrame) -> Dict[str, Any
     return {
         "action": action,
         "confidence": float(confidence),
-        "regime_probs": regime_probs.tolist(),
+        "regime_probs": np.asarray(regime_probs).tolist(),
         "weighted_signal": float(weighted_signal)
     }
+
+def aggregate_regime_probs(regime_probs: np.ndarray, labels: Optional[Sequence[str]] = None) -> np.ndarray:
+    """
+    Collapse per-state probabilities into bull/bear/sideways probabilities.
+    Args:
+        regime_probs (np.ndarray): Probability per model state.
+        labels (Optional[Sequence[str]]): Regime name per state; without labels the
+            states must be exactly bull, bear, sideways in that order.
+    Returns:
+        np.ndarray: Bull, bear and sideways probabilities.
+    """
+    regime_probs = np.asarray(regime_probs)
+    if labels is None:
+        if len(regime_probs) != 3:
+            raise ValueError("Expected 3 regime probabilities")
+        return regime_probs
+    if len(labels) != len(regime_probs):
+        raise ValueError("Expected one label per regime probability")
+    labels = np.asarray(labels)
+    return np.array([regime_probs[labels == name].sum() for name in REGIME_NAMES])
+
+def generate_signal(regime_probs: np.ndarray, df: pd.DataFrame,
+                    labels: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    regime_probs = aggregate_regime_probs(regime_probs, labels)
+    return combine_signals(regime_probs, bull_strategy(df), bear_strategy(df), sideways_strategy(df))
+
+
+class RollingMean:
+    """
+    Mean of the last ``window`` values in a ring buffer, updated in O(1).
+    Like ``Series.rolling(window).mean()``, it is NaN until the window is full
+    or while the window holds a NaN.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buffer = np.full(window, np.nan)
+        self.pos = 0
+        self.count = 0
+        self._sum = 0.0
+        self._compensation = 0.0
+        self._nans = window
+
+    def _add(self, value: float) -> None:
+        # Kahan summation keeps the running sum from drifting over long streams.
+        y = value - self._compensation
+        t = self._sum + y
+        self._compensation = (t - self._sum) - y
+        self._sum = t
+
+    def update(self, value: float) -> float:
+        old = self.buffer[self.pos]
+        if np.isnan(old):
+            self._nans -= 1
+        else:
+            self._add(-old)
+        if np.isnan(value):
+            self._nans += 1
+        else:
+            self._add(value)
+        self.buffer[self.pos] = value
+        self.pos = (self.pos + 1) % self.window
+        self.count += 1
+        if self.pos == 0:
+            self._resum()
+        return self.value
+
+    def _resum(self) -> None:
+        valid = self.buffer[~np.isnan(self.buffer)]
+        self._sum = float(valid.sum())
+        self._compensation = 0.0
+        self._nans = self.window - len(valid)
+
+    @property
+    def value(self) -> float:
+        if self.count < self.window or self._nans:
+            return np.nan
+        return self._sum / self.window
+
+    def values(self) -> np.ndarray:
+        # Buffer contents, oldest first.
+        return np.roll(self.buffer, -self.pos)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "count": self.count,
+            "values": [None if np.isnan(v) else float(v) for v in self.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RollingMean":
+        state = cls(int(data["window"]))
+        state.buffer = np.array([np.nan if v is None else float(v) for v in data["values"]])
+        state.count = int(data["count"])
+        state._resum()
+        return state
+
+
+class MACrossoverState:
+    """Incremental equivalent of calculate_ma_crossover on the latest bars."""
+
+    def __init__(self, short_window: int = 50, long_window: int = 200):
+        self.short = RollingMean(short_window)
+        self.long = RollingMean(long_window)
+
+    def update(self, close: float) -> float:
+        self.short.update(close)
+        self.long.update(close)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        short_ma, long_ma = self.short.value, self.long.value
+        if self.long.count < self.long.window or np.isnan(short_ma) or np.isnan(long_ma):
+            return 0.0
+        return 1.0 if short_ma > long_ma else -1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"short": self.short.to_dict(), "long": self.long.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MACrossoverState":
+        state = cls()
+        state.short = RollingMean.from_dict(data["short"])
+        state.long = RollingMean.from_dict(data["long"])
+        return state
+
+
+class RSIState:
+    """Incremental equivalent of calculate_rsi (simple rolling means of gains and losses)."""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.gains = RollingMean(window)
+        self.losses = RollingMean(window)
+        self.prev_close = np.nan
+        self.count = 0
+
+    def update(self, close: float) -> float:
+        delta = close - self.prev_close
+        # calculate_rsi's where(..., 0) turns a NaN delta into a zero gain and loss.
+        self.gains.update(delta if delta > 0 else 0.0)
+        self.losses.update(-delta if delta < 0 else 0.0)
+        self.prev_close = close
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.count < self.window + 1:
+            return 50.0
+        gain, loss = self.gains.value, self.losses.value
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + np.float64(gain) / np.float64(loss)))
+        return float(rsi) if not np.isnan(rsi) else 50.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "count": self.count,
+            "prev_close": None if np.isnan(self.prev_close) else float(self.prev_close),
+            "gains": self.gains.to_dict(),
+            "losses": self.losses.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RSIState":
+        state = cls(int(data["window"]))
+        state.count = int(data["count"])
+        state.prev_close = np.nan if data["prev_close"] is None else float(data["prev_close"])
+        state.gains = RollingMean.from_dict(data["gains"])
+        state.losses = RollingMean.from_dict(data["losses"])
+        return state
+
+
+class IndicatorState:
+    """
+    Streaming state behind generate_signal: feed one bar at a time with
+    update() and call signal() per tick without touching a DataFrame.
+    to_dict() is JSON-safe, so the state can be stored with a snapshot and
+    resumed elsewhere with from_dict().
+    """
+
+    def __init__(self, short_window: int = 50, long_window: int = 200, rsi_window: int = 14):
+        self.ma = MACrossoverState(short_window, long_window)
+        self.rsi = RSIState(rsi_window)
+        self.last_timestamp: Optional[str] = None
+
+    def update(self, close: float, timestamp: Any = None) -> None:
+        close = float(close)
+        self.ma.update(close)
+        self.rsi.update(close)
+        if timestamp is not None:
+            self.last_timestamp = str(timestamp)
+
+    def catch_up(self, df: pd.DataFrame) -> int:
+        # Feed the bars after last_timestamp; returns how many were applied.
+        close_prices = df['Close']
+        if isinstance(close_prices, pd.DataFrame):
+            close_prices = close_prices.iloc[:, 0]
+        if self.last_timestamp is not None:
+            start = close_prices.index.searchsorted(pd.Timestamp(self.last_timestamp), side='right')
+            close_prices = close_prices.iloc[start:]
+        for timestamp, close in close_prices.items():
+            self.update(close, timestamp)
+        return len(close_prices)
+
+    def follows(self, df: pd.DataFrame) -> bool:
+        # True if df extends the bars already applied (adjusted-price rewrites of history do not).
+        if self.last_timestamp is None:
+            return False
+        timestamp = pd.Timestamp(self.last_timestamp)
+        if timestamp not in df.index:
+            return False
+        close = df['Close']
+        if isinstance(close, pd.DataFrame):
+            close = close.iloc[:, 0]
+        last_close = float(close.loc[timestamp])
+        previous = self.rsi.prev_close
+        return last_close == previous or (np.isnan(last_close) and np.isnan(previous))
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame, **kwargs) -> "IndicatorState":
+        state = cls(**kwargs)
+        # Only the longest window plus one bar of history can affect the state.
+        state.catch_up(df.tail(max(state.ma.long.window, state.rsi.window + 1)))
+        return state
+
+    def signal(self, regime_probs: np.ndarray, labels: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        regime_probs = aggregate_regime_probs(regime_probs, labels)
+        return combine_signals(regime_probs, self.ma.value, rsi_signal(self.rsi.value), 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ma": self.ma.to_dict(),
+            "rsi": self.rsi.to_dict(),
+            "last_timestamp": self.last_timestamp,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndicatorState":
+        state = cls()
+        state.ma = MACrossoverState.from_dict(data["ma"])
+        state.rsi = RSIState.from_dict(data["rsi"])
+        state.last_timestamp = data.get("last_timestamp")
+        return state
@@ -0,0 +1,229 @@
+"""
+Synthetic OHLCV generator driven by regime-switching parameters.
+
+Samples a Markov chain of regimes and Gaussian daily log returns per regime,
+either from explicit parameters or from a fitted RegimeHMM, and builds
+yfinance-shaped OHLCV frames. Frames can be written straight into the
+data_loader cache layout, so backtests and the API run at any history length
+or symbol count with no network:
+
+    python -m app.synthetic --symbols 200 --days 25000 --dir /tmp/synthetic
+    DATA_CACHE_DIR=/tmp/synthetic uvicorn app.api:app
+"""
+
+import argparse
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import SYMBOL, cache_data, cache_path_for
+from .model import RegimeHMM
+
+# Where the CLI writes unless told otherwise; never the live data_loader cache.
+SYNTHETIC_DIR = '/tmp/synthetic'
+
+# Bull, bear and sideways regimes with daily log-return moments close to a
+# broad US equity index.
+DEFAULT_REGIME_PARAMS: Dict[str, np.ndarray] = {
+    "startprob": np.array([0.6, 0.1, 0.3]),
+    "transmat": np.array([
+        [0.985, 0.005, 0.010],
+        [0.020, 0.960, 0.020],
+        [0.015, 0.010, 0.975],
+    ]),
+    "means": np.array([0.0008, -0.0015, 0.0002]),
+    "stds": np.array([0.007, 0.022, 0.011]),
+}
+
+
+@lru_cache(maxsize=8)
+def business_days(start: str, n_days: int) -> pd.DatetimeIndex:
+    # bdate_range is slow for long ranges and identical across symbols, so build it once.
+    return pd.bdate_range(start, periods=n_days, name='Date')
+
+
+def regime_params_from_model(model: RegimeHMM) -> Dict[str, np.ndarray]:
+    """
+    Extract sampling parameters from a fitted RegimeHMM.
+    Args:
+        model (RegimeHMM): Fitted model on daily log returns.
+    Returns:
+        Dict[str, np.ndarray]: startprob, transmat, means and stds per regime.
+    """
+    if model.model is None:
+        raise ValueError('Model not fitted.')
+    hmm = model.model
+    # Observations are 1-D, so every covariance type reduces to one variance per state.
+    variances = np.asarray(hmm.covars_).reshape(hmm.n_components, -1)[:, 0]
+    return {
+        "startprob": np.asarray(hmm.startprob_, dtype=np.float64),
+        "transmat": np.asarray(hmm.transmat_, dtype=np.float64),
+        "means": np.asarray(hmm.means_, dtype=np.float64)[:, 0],
+        "stds": np.sqrt(variances),
+    }
+
+
+def sample_regimes(n_days: int, startprob: np.ndarray, transmat: np.ndarray,
+                   rng: np.random.Generator) -> np.ndarray:
+    """
+    Sample a regime path by drawing whole regime spells: a spell in state i
+    lasts Geometric(1 - p_ii) days and is followed by a draw from the
+    off-diagonal row. This is exact for a Markov chain and loops once per
+    regime switch instead of once per day.
+    Returns:
+        np.ndarray: Regime index per day.
+    """
+    n_states = len(startprob)
+    states = np.empty(n_days, dtype=np.int64)
+    state = rng.choice(n_states, p=startprob)
+    day = 0
+    while day < n_days:
+        stay = transmat[state, state]
+        length = n_days - day if stay >= 1.0 else int(rng.geometric(1.0 - stay))
+        states[day:day + length] = state
+        day += length
+        leave = transmat[state].copy()
+        leave[state] = 0.0
+        if leave.sum() <= 0:
+            states[day:] = state
+            break
+        state = rng.choice(n_states, p=leave / leave.sum())
+    return states
+
+
+def generate_ohlcv(n_days: int, params: Optional[Dict[str, np.ndarray]] = None,
+                   model: Optional[RegimeHMM] = None, seed: Union[int, np.random.SeedSequence] = 0,
+                   start: str = '2000-01-03', start_price: float = 100.0,
+                   base_volume: float = 8e7, return_states: bool = False
+                   ) -> Union[pd.DataFrame, Tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Generate one synthetic OHLCV frame on a business-day index.
+    Args:
+        n_days (int): Number of bars.
+        params (Optional[Dict[str, np.ndarray]]): Regime parameters; defaults to DEFAULT_REGIME_PARAMS.
+        model (Optional[RegimeHMM]): Fitted model to take parameters from (overrides params).
+        seed: Random seed or SeedSequence.
+        start (str): First bar date.
+        start_price (float): Opening price level.
+        base_volume (float): Median daily volume.
+        return_states (bool): Also return the sampled regime path.
+    Returns:
+        pd.DataFrame: Close/High/Low/Open/Volume indexed by 'Date', like fetch_ohlcv.
+    """
+    if model is not None:
+        params = regime_params_from_model(model)
+    params = params or DEFAULT_REGIME_PARAMS
+    rng = np.random.default_rng(seed)
+
+    states = sample_regimes(n_days, np.asarray(params["startprob"]), np.asarray(params["transmat"]), rng)
+    means = np.asarray(params["means"])[states]
+    stds = np.asarray(params["stds"])[states]
+    log_returns = rng.normal(means, stds)
+    close = start_price * np.exp(np.cumsum(log_returns))
+
+    # Overnight gap is a slice of the day's move; the intraday range scales with regime volatility.
+    previous_close = np.concatenate([[start_price], close[:-1]])
+    open_ = previous_close * np.exp(rng.normal(0.0, 0.25 * stds))
+    wick = np.abs(rng.normal(0.0, 0.5 * stds, size=(2, n_days)))
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+    volume = base_volume * np.exp(rng.normal(0.0, 0.3, n_days)) * (1.0 + 20.0 * np.abs(log_returns))
+
+    index = business_days(start, n_days)
+    df = pd.DataFrame({
+        'Close': close,
+        'High': high,
+        'Low': low,
+        'Open': open_,
+        'Volume': volume.astype(np.int64),
+    }, index=index)
+    if return_states:
+        return df, states
+    return df
+
+
+def symbol_names(n_symbols: int) -> List[str]:
+    return [f'SYN{i:04d}' for i in range(n_symbols)]
+
+
+def generate_universe(symbols: Union[int, List[str]], n_days: int,
+                      params: Optional[Dict[str, np.ndarray]] = None,
+                      model: Optional[RegimeHMM] = None, seed: int = 0,
+                      **kwargs) -> Dict[str, pd.DataFrame]:
+    """
+    Generate independent frames for many symbols from one seed.
+    Args:
+        symbols (Union[int, List[str]]): Symbol names, or a count of generated names.
+        n_days (int): Bars per symbol.
+        params, model: Regime parameters, as for generate_ohlcv.
+        seed (int): Base seed; each symbol gets its own child seed.
+    Returns:
+        Dict[str, pd.DataFrame]: Frame per symbol.
+    """
+    if isinstance(symbols, int):
+        symbols = symbol_names(symbols)
+    if model is not None:
+        params = regime_params_from_model(model)
+    seeds = np.random.SeedSequence(seed).spawn(len(symbols))
+    return {
+        symbol: generate_ohlcv(n_days, params=params, seed=child, **kwargs)
+        for symbol, child in zip(symbols, seeds)
+    }
+
+
+def write_universe(frames: Dict[str, pd.DataFrame], directory: Optional[str] = None,
+                   overwrite_live: bool = False) -> Dict[str, str]:
+    """
+    Write frames in the data_loader cache layout.
+    Args:
+        frames (Dict[str, pd.DataFrame]): Frame per symbol.
+        directory (Optional[str]): Cache directory; defaults to data_loader's. Point
+            DATA_CACHE_DIR at it to serve the synthetic data.
+        overwrite_live (bool): Allow writing into data_loader's own cache directory,
+            replacing real cached data.
+    Returns:
+        Dict[str, str]: Written path per symbol.
+    """
+    live_dir = os.path.realpath(os.path.dirname(cache_path_for(SYMBOL)))
+    if not overwrite_live and (directory is None or os.path.realpath(directory) == live_dir):
+        raise ValueError(f"Refusing to write synthetic data into the live cache directory {live_dir}")
+    paths = {}
+    for symbol, df in frames.items():
+        path = cache_path_for(symbol)
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, os.path.basename(path))
+        cache_data(df, path)
+        paths[symbol] = path
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic regime-switching OHLCV data.")
+    parser.add_argument("--symbols", type=int, default=1, help="Number of symbols (the first is named SYMBOL)")
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dir", default=SYNTHETIC_DIR, help="Cache directory to write into")
+    parser.add_argument("--overwrite-live", action="store_true",
+                        help="Allow --dir to be the live data cache directory (replaces real data)")
+    parser.add_argument("--from-model", default=None, help="Pickled model to take regime parameters from")
+    args = parser.parse_args()
+
+    model = None
+    if args.from_model:
+        model = RegimeHMM()
+        model.load(args.from_model)
+    symbols = [SYMBOL] + symbol_names(args.symbols - 1)
+    try:
+        paths = write_universe(generate_universe(symbols, args.days, model=model, seed=args.seed),
+                               args.dir, overwrite_live=args.overwrite_live)
+    except ValueError as e:
+        parser.error(f"{e}; pass --overwrite-live to do it anyway")
+    print(f"Wrote {len(paths)} symbols x {args.days} days to {os.path.dirname(next(iter(paths.values())))}")
+
+
+if __name__ == "__main__":
+    main()
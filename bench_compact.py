@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the reduced-precision compact data mode.
+
+Reports memory and on-disk size of OHLCV frames in float64 vs compact
+(float32) form, the footprint of per-day backtest results as a list of arrays
+vs preallocated typed arrays, and checks that compact-mode backtest signals
+stay within tolerance of full precision. Runs offline on synthetic data.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from app import data_loader
+from app.backtest import run_backtest
+from app.data_loader import SYMBOL, cache_data, cache_path_for, to_compact
+from app.synthetic import generate_ohlcv, generate_universe
+
+
+def frame_memory(n_symbols: int, n_days: int, directory: str) -> dict:
+    frames = generate_universe(n_symbols, n_days, seed=0)
+    full = sum(df.memory_usage(deep=True).sum() for df in frames.values())
+    compact = sum(to_compact(df).memory_usage(deep=True).sum() for df in frames.values())
+
+    df = next(iter(frames.values()))
+    full_path = os.path.join(directory, 'bench_full.parquet')
+    compact_path = os.path.join(directory, 'bench_compact.parquet')
+    cache_data(df, full_path, compact=False)
+    cache_data(df, compact_path, compact=True)
+    return {
+        "symbols": n_symbols,
+        "days": n_days,
+        "memory_full_bytes": int(full),
+        "memory_compact_bytes": int(compact),
+        "parquet_full_bytes": os.path.getsize(full_path),
+        "parquet_compact_bytes": os.path.getsize(compact_path),
+    }
+
+
+def result_memory(n_days: int, n_states: int = 3) -> dict:
+    def measure(build) -> int:
+        tracemalloc.start()
+        kept = build()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        return size
+
+    def as_lists():
+        probs = [np.full(n_states, 1.0 / n_states) for _ in range(n_days)]
+        signals = [1 for _ in range(n_days)]
+        weighted = [0.5 for _ in range(n_days)]
+        return probs, signals, weighted
+
+    def as_arrays(dtype):
+        return (np.zeros((n_days, n_states), dtype=dtype), np.zeros(n_days, dtype=np.int8),
+                np.zeros(n_days, dtype=dtype), np.zeros(n_days, dtype=bool))
+
+    return {
+        "days": n_days,
+        "list_of_arrays_bytes": measure(as_lists),
+        "typed_arrays_float64_bytes": measure(lambda: as_arrays(np.float64)),
+        "typed_arrays_float32_bytes": measure(lambda: as_arrays(np.float32)),
+    }
+
+
+def signal_parity(n_days: int, lookback_years: int) -> dict:
+    cache_data(generate_ohlcv(n_days, seed=11), cache_path_for(SYMBOL), compact=False)
+    timings = {}
+    results = {}
+    for compact in (False, True):
+        started = time.perf_counter()
+        results[compact] = run_backtest(lookback_years=lookback_years, verbose=False, compact=compact)
+        timings[compact] = time.perf_counter() - started
+
+    full, compact = results[False], results[True]
+    common = sorted(set(full["dates"]) & set(compact["dates"]))
+    full_by_date = dict(zip(full["dates"], zip(full["signals"], full["regime_probs"])))
+    compact_by_date = dict(zip(compact["dates"], zip(compact["signals"], compact["regime_probs"])))
+    agreement = np.mean([full_by_date[d][0] == compact_by_date[d][0] for d in common])
+    prob_diff = max(np.max(np.abs(np.subtract(full_by_date[d][1], compact_by_date[d][1]))) for d in common)
+    return {
+        "days": len(common),
+        "signal_agreement": float(agreement),
+        "max_prob_abs_diff": float(prob_diff),
+        "sharpe_full": full["strategy_metrics"]["sharpe_ratio"],
+        "sharpe_compact": compact["strategy_metrics"]["sharpe_ratio"],
+        "seconds_full": timings[False],
+        "seconds_compact": timings[True],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark compact (float32) data mode.")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--days", type=int, default=25200, help="Bars per symbol for the memory benchmark")
+    parser.add_argument("--parity-days", type=int, default=400)
+    parser.add_argument("--lookback-years", type=int, default=1)
+    parser.add_argument("--min-agreement", type=float, default=0.99)
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    # Private cache directory: the parity run overwrites the default symbol's cache file.
+    directory = tempfile.mkdtemp(prefix='bench_compact_')
+    previous_path = data_loader.PARQUET_PATH
+    data_loader.PARQUET_PATH = os.path.join(directory, os.path.basename(previous_path))
+    try:
+        report = {
+            "frames": frame_memory(args.symbols, args.days, directory),
+            "results": result_memory(args.days),
+            "parity": signal_parity(args.parity_days, args.lookback_years),
+        }
+    finally:
+        data_loader.PARQUET_PATH = previous_path
+        shutil.rmtree(directory, ignore_errors=True)
+
+    frames, results, parity = report["frames"], report["results"], report["parity"]
+    print(f"OHLCV in memory ({frames['symbols']} x {frames['days']}): "
+          f"{frames['memory_full_bytes'] / 1e6:.1f} MB -> {frames['memory_compact_bytes'] / 1e6:.1f} MB")
+    print(f"Parquet per symbol: {frames['parquet_full_bytes'] / 1e3:.0f} kB -> "
+          f"{frames['parquet_compact_bytes'] / 1e3:.0f} kB")
+    print(f"Per-day results ({results['days']} days): list of arrays {results['list_of_arrays_bytes'] / 1e6:.2f} MB, "
+          f"typed float64 {results['typed_arrays_float64_bytes'] / 1e6:.2f} MB, "
+          f"typed float32 {results['typed_arrays_float32_bytes'] / 1e6:.2f} MB")
+    print(f"Signal parity over {parity['days']} days: agreement {parity['signal_agreement']:.4f}, "
+          f"max |dprob| {parity['max_prob_abs_diff']:.2e}, "
+          f"Sharpe {parity['sharpe_full']:.4f} vs {parity['sharpe_compact']:.4f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if parity["signal_agreement"] < args.min_agreement:
+        print(f"FAIL: signal agreement below {args.min_agreement}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,71 @@
 #!/usr/bin/env python3
 """
 Simple script to run the Regime-Switching Trading Engine FastAPI application.
+
+Development (default): one auto-reloading process.
+Production (``--prod``): this process acts as a supervisor. It fits or loads
+each symbol's model once, publishes it as versioned read-only artifacts,
+republishes when new data arrives, and serves with ``--workers`` uvicorn
+worker processes that attach to the artifacts instead of fitting.
 """
 
+import argparse
+import os
+import threading
+
 import uvicorn
-from app.api import app
+
+
+def run_production(args: argparse.Namespace) -> None:
+    # Workers are spawned with this environment, so they attach to the same artifact root.
+    os.environ['ARTIFACT_DIR'] = args.artifact_dir
+    from app.artifacts import publish_loop, publish_symbol
+
+    for symbol in args.symbols:
+        version = publish_symbol(symbol, args.artifact_dir, refit=not args.no_refit)
+        print(f"Published {symbol} artifacts: {version}")
+
+    stop = threading.Event()
+    publisher = threading.Thread(target=publish_loop, daemon=True,
+                                 args=(args.symbols, args.refresh_interval, stop, args.artifact_dir))
+    publisher.start()
+    try:
+        uvicorn.run(
+            "app.api:app",
+            host="0.0.0.0",
+            port=args.port,
+            workers=args.workers,
+            log_level="info"
+        )
+    finally:
+        stop.set()
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the trading engine API.")
+    parser.add_argument("--prod", action="store_true", help="Multi-worker mode with shared published models")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--symbols", nargs="+", default=[os.getenv('SYMBOL', 'SPY')])
+    parser.add_argument("--artifact-dir", default=os.getenv('ARTIFACT_DIR') or '/tmp/regime-artifacts')
+    parser.add_argument("--refresh-interval", type=float,
+                        default=float(os.getenv('ARTIFACT_REFRESH_SECONDS', '3600')),
+                        help="Seconds between data refreshes and republishing")
+    parser.add_argument("--no-refit", action="store_true", help="Reuse saved models when available")
+    args = parser.parse_args()
+
     print("Starting Regime-Switching Trading Engine...")
-    print("API will be available at: http://localhost:8082")
-    print("API documentation at: http://localhost:8082/docs")
+    print(f"API will be available at: http://localhost:{args.port}")
+    print(f"API documentation at: http://localhost:{args.port}/docs")
     print("Press Ctrl+C to stop the server")
-    
-    uvicorn.run(
-        "app.api:app",
-        host="0.0.0.0",
-        port=8082,  # Changed from 8000 to 8082 for consistency
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+
+    if args.prod:
+        run_production(args)
+    else:
+        uvicorn.run(
+            "app.api:app",
+            host="0.0.0.0",
+            port=args.port,  # Changed from 8000 to 8082 for consistency
+            reload=True,
+            log_level="info"
+        )
@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+import app.api as api
+
+class TestBatchEndpoints:
+    """Test cases for the multi-symbol batch endpoints."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.sample_df = pd.DataFrame({
+            'Close': np.linspace(100, 200, 300)
+        }, index=pd.date_range('2023-01-01', periods=300))
+        self.model = MagicMock()
+        self.model.predict_proba.return_value = np.array([0.8, 0.1, 0.1])
+        self.model.version.return_value = 'v1'
+        self.client = TestClient(api.app)
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        api.cold_symbols.clear()
+        api.missing_symbols.clear()
+
+    def fake_get_df(self, force_refresh=False, symbol='SPY'):
+        if symbol == 'BAD':
+            return pd.DataFrame()
+        return self.sample_df
+
+    def test_parse_symbols(self):
+        """Test comma-separated and repeated symbol parsing."""
+        assert api.parse_symbols(['spy,QQQ', 'iwm', 'SPY']) == ['SPY', 'QQQ', 'IWM']
+
+    def test_regime_batch_isolates_errors(self):
+        """Test that a failing symbol is reported without failing the batch."""
+        with patch.object(api, 'get_latest_df', side_effect=self.fake_get_df), \
+             patch.object(api, 'get_or_create_model', return_value=self.model), \
+             patch.object(api, 'get_snapshot_store', return_value=None):
+            response = self.client.get('/regime/batch?symbols=SPY,QQQ,BAD')
+
+        assert response.status_code == 200
+        data = response.json()
+        assert list(data['results']) == ['SPY', 'QQQ']
+        assert data['results']['SPY']['bull_probability'] == pytest.approx(0.8)
+        assert 'BAD' in data['errors']
+
+    def test_signal_batch_uses_snapshots(self):
+        """Test that stored snapshots are served without fitting a model."""
+        store = MagicMock()
+        store.batch_get_items.return_value = {
+            'QQQ': {
+                'symbol': 'QQQ', 'timestamp': '2024-01-02 00:00:00', 'regime_probs': [0.2, 0.3, 0.5],
+                'signal': {'action': 'HOLD', 'confidence': 0.9, 'regime_probs': [0.2, 0.3, 0.5], 'weighted_signal': 0.1}
+            }
+        }
+        with patch.object(api, 'snapshot_store', store), \
+             patch.object(api, 'get_latest_df', side_effect=self.fake_get_df), \
+             patch.object(api, 'get_or_create_model', return_value=self.model) as mock_model:
+            response = self.client.get('/signal/batch?symbols=SPY&symbols=QQQ')
+
+        data = response.json()
+        assert data['results']['QQQ']['action'] == 'HOLD'
+        assert data['results']['SPY']['action'] == 'BUY'
+        assert mock_model.call_count == 1
+
+    def test_parse_symbols_validates(self):
+        """Test ticker syntax, the allowlist and the batch cap."""
+        assert api.parse_symbols(['brk-b,^gspc,es=f']) == ['BRK-B', '^GSPC', 'ES=F']
+        for bad in (['../etc'], ['SPY;DROP'], ['X' * 40]):
+            with pytest.raises(api.HTTPException):
+                api.parse_symbols(bad)
+        with patch.object(api, 'ALLOWED_SYMBOLS', {'SPY'}), pytest.raises(api.HTTPException):
+            api.parse_symbols(['SPY,QQQ'])
+        with patch.object(api, 'MAX_BATCH_SYMBOLS', 2), pytest.raises(api.HTTPException):
+            api.parse_symbols(['A,B,C'])
+
+    def test_cold_symbol_fitted_once(self):
+        """Test that concurrent requests for a cold symbol share one fit, and models are LRU-bounded."""
+        fits = []
+
+        def slow_fit(self_model, df):
+            fits.append(1)
+            time.sleep(0.2)
+
+        with patch.object(api, 'symbol_models', api.ResponseCache(maxsize=1)), \
+             patch.object(api.RegimeHMM, 'load_cached', return_value=False), \
+             patch.object(api.RegimeHMM, 'save_cached'), \
+             patch.object(api.RegimeHMM, 'fit', autospec=True, side_effect=slow_fit):
+            threads = [threading.Thread(target=api.get_or_create_model, args=('QQQ', self.sample_df))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            api.get_or_create_model('IWM', self.sample_df)
+
+            assert len(fits) == 2
+            assert api.symbol_models.get('QQQ') is None
+            assert len(api.symbol_models) == 1
+            assert api.model_locks == {}
+
+    def test_batch_rejects_empty(self):
+        """Test that an empty symbol list is rejected."""
+        response = self.client.get('/regime/batch?symbols=,')
+        assert response.status_code == 400
+
+    @patch('app.data_loader.get_cache', return_value=None)
+    @patch('app.data_loader.fetch_ohlcv', return_value=pd.DataFrame())
+    def test_unknown_symbol_not_cached_or_refetched(self, mock_fetch, mock_get_cache):
+        """Test that a ticker without data writes no cache and is not fetched again within the TTL."""
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with patch('app.data_loader.PARQUET_PATH', os.path.join(cache_dir, 'data_cache.parquet')), \
+                 patch.object(api, 'get_snapshot_store', return_value=None):
+                for _ in range(3):
+                    response = self.client.get('/signal/batch?symbols=ZZZZ1')
+                    assert 'ZZZZ1' in response.json()['errors']
+
+            assert mock_fetch.call_count == 1
+            assert [name for name in os.listdir(cache_dir) if not name.endswith('.lock')] == []
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_cold_symbols_capped(self):
+        """Test that without an allowlist a worker loads at most MAX_COLD_SYMBOLS symbols besides the default."""
+        with patch.object(api, 'MAX_COLD_SYMBOLS', 1), \
+             patch.object(api, 'get_latest_df', side_effect=self.fake_get_df), \
+             patch.object(api, 'get_or_create_model', return_value=self.model), \
+             patch.object(api, 'get_snapshot_store', return_value=None):
+            response = self.client.get('/regime/batch?symbols=QQQ,DIA,SPY')
+
+        data = response.json()
+        assert list(data['results']) == ['QQQ', 'SPY']
+        assert 'Symbol limit reached' in data['errors']['DIA']
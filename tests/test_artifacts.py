@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import app.api as api
+from app.artifacts import ArtifactReader, attach_artifacts, publish_artifacts, read_current
+from app.model import RegimeHMM
+
+class TestArtifacts:
+    """Test cases for published read-only model artifacts."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.artifact_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, 300)))
+        self.df = pd.DataFrame({'Close': close, 'Volume': 1000},
+                               index=pd.bdate_range('2023-01-02', periods=300, name='Date'))
+        self.model = RegimeHMM(n_states=3)
+        self.model.fit(self.df)
+        api.response_cache.clear()
+        api.artifact_readers.clear()
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        api.artifact_readers.clear()
+        shutil.rmtree(self.artifact_dir, ignore_errors=True)
+
+    def test_publish_and_attach_round_trip(self):
+        """Test that an attached version reproduces the model and data without refitting."""
+        version = publish_artifacts('SPY', self.df, self.model, self.artifact_dir)
+        assert read_current('SPY', self.artifact_dir) == version
+
+        with patch.object(RegimeHMM, 'fit_returns') as mock_fit:
+            artifacts = attach_artifacts('SPY', version, self.artifact_dir)
+        mock_fit.assert_not_called()
+
+        assert artifacts.model.version() == self.model.version()
+        assert artifacts.df.index.equals(self.df.index)
+        assert not artifacts.df['Close'].to_numpy().flags.writeable
+        assert np.allclose(artifacts.model.predict_proba(artifacts.df.tail(30)),
+                           self.model.predict_proba(self.df.tail(30)))
+
+    def test_reader_swaps_to_new_version(self):
+        """Test hot-swapping on a new CURRENT and keeping the old version if attaching fails."""
+        first = publish_artifacts('SPY', self.df.iloc[:-5], self.model, self.artifact_dir)
+        reader = ArtifactReader('SPY', self.artifact_dir, poll_seconds=0)
+        assert reader.current().version == first
+
+        second = publish_artifacts('SPY', self.df, self.model, self.artifact_dir)
+        assert reader.current().version == second
+        assert len(reader.current().df) == len(self.df)
+
+        os.remove(os.path.join(self.artifact_dir, 'SPY', first, 'manifest.json'))
+        publish_artifacts('SPY', self.df.iloc[:-5], self.model, self.artifact_dir)
+        assert reader.current().version == second
+
+    def test_api_serves_published_model(self):
+        """Test that a production worker serves artifacts and never fits or loads data."""
+        publish_artifacts('SPY', self.df, self.model, self.artifact_dir)
+        with patch.object(api, 'ARTIFACT_DIR', self.artifact_dir), \
+             patch('app.artifacts.ARTIFACT_DIR', self.artifact_dir), \
+             patch.object(api, 'get_or_create_model') as mock_model, \
+             patch.object(api, 'get_latest_df') as mock_df:
+            client = TestClient(api.app)
+            regime = client.get('/regime/latest')
+            missing = client.get('/regime/batch?symbols=QQQ')
+
+        assert regime.status_code == 200
+        assert regime.json()['timestamp'] == str(self.df.index[-1])
+        assert 'QQQ' in missing.json()['errors']
+        mock_model.assert_not_called()
+        mock_df.assert_not_called()
@@ -0,0 +1,95 @@
+import pytest
+import numpy as np
+import pandas as pd
+import os
+from unittest.mock import patch
+from app.backtest import run_backtest, build_validity_index
+from app.model import RegimeHMM
+from app.data_loader import to_compact
+
+class TestBacktest:
+    """Test cases for the walk-forward backtest."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.test_checkpoint_path = '/tmp/test_backtest_checkpoint.pkl'
+        rng = np.random.default_rng(0)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, 140)))
+        self.full_df = pd.DataFrame({'Close': close}, index=pd.bdate_range('2023-01-02', periods=140))
+
+    def teardown_method(self):
+        """Cleanup test environment."""
+        if os.path.exists(self.test_checkpoint_path):
+            os.remove(self.test_checkpoint_path)
+
+    def run(self, df, **kwargs):
+        with patch('app.backtest.get_latest_df', return_value=df):
+            return run_backtest(lookback_years=0, verbose=False, **kwargs)
+
+    def test_run_backtest_results(self):
+        """Test the shape of backtest results."""
+        results = self.run(self.full_df)
+
+        assert "error" not in results
+        skipped = results["diagnostics"]["counts"].get("day_exception", 0)
+        assert len(results["dates"]) + skipped == len(self.full_df) - 101
+        assert len(results["signals"]) == len(results["regime_probs"])
+
+    def test_checkpoint_resume_only_computes_new_days(self):
+        """Test that a resumed run fits only the newly available days."""
+        expected = self.run(self.full_df)
+        self.run(self.full_df.iloc[:-5], checkpoint_path=self.test_checkpoint_path)
+        assert os.path.exists(self.test_checkpoint_path)
+
+        with patch.object(RegimeHMM, 'fit_returns', autospec=True, side_effect=RegimeHMM.fit_returns) as mock_fit:
+            resumed = self.run(self.full_df, checkpoint_path=self.test_checkpoint_path)
+
+        assert mock_fit.call_count == 5
+        assert resumed["dates"] == expected["dates"]
+        assert resumed["signals"] == expected["signals"]
+        assert resumed["strategy_metrics"] == pytest.approx(expected["strategy_metrics"])
+
+    def test_checkpoint_resumes_after_one_bar_shift(self):
+        """Test that a daily update (oldest bar dropped, newest added) computes only the new day."""
+        self.run(self.full_df.iloc[:-1], checkpoint_path=self.test_checkpoint_path)
+        shifted = self.full_df.iloc[1:]
+        expected = self.run(shifted)
+
+        with patch.object(RegimeHMM, 'fit_returns', autospec=True, side_effect=RegimeHMM.fit_returns) as mock_fit:
+            resumed = self.run(shifted, checkpoint_path=self.test_checkpoint_path)
+
+        assert mock_fit.call_count == 1
+        assert resumed["dates"] == expected["dates"]
+        assert resumed["signals"] == expected["signals"]
+        assert np.allclose(resumed["regime_probs"], expected["regime_probs"])
+        assert [f for f in os.listdir('/tmp') if f.startswith('.test_backtest_checkpoint.pkl.')] == []
+
+    def test_compact_mode_signal_parity(self):
+        """Test that float32 data reproduces full-precision signals within tolerance."""
+        full = self.run(self.full_df, compact=False)
+        compact = self.run(to_compact(self.full_df), compact=True)
+
+        common = set(full["dates"]) & set(compact["dates"])
+        full_by_date = dict(zip(full["dates"], zip(full["signals"], full["regime_probs"])))
+        compact_by_date = dict(zip(compact["dates"], zip(compact["signals"], compact["regime_probs"])))
+        assert len(common) > 0
+        for date in common:
+            assert full_by_date[date][0] == compact_by_date[date][0]
+            assert np.allclose(full_by_date[date][1], compact_by_date[date][1], atol=1e-3)
+
+    def test_validity_index_matches_window_checks(self):
+        """Test O(1) window checks against per-window pandas checks, with NaNs and zero prices."""
+        df = self.full_df.assign(Volume=1.0)
+        df.iloc[20, 0] = np.nan
+        df.iloc[60:63, 0] = 0.0
+        df.iloc[90, 1] = np.nan
+        index = build_validity_index(df)
+        window = 30
+        for i in range(window, len(df)):
+            close_prices = df['Close'].iloc[i - window:i]
+            has_nan = index["nan_closes"][i] != index["nan_closes"][i - window]
+            assert has_nan == close_prices.isnull().any()
+            if not has_nan:
+                n_returns = window - 1 - (index["bad_returns"][i] - index["bad_returns"][i - window + 1])
+                assert n_returns == len(close_prices.pct_change().dropna())
+            assert (index["row_has_nan"][i - 1] or index["row_has_nan"][i]) == df.iloc[i - 1:i + 1].isnull().any().any()
@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+import pandas as pd
+from app.backtest import calculate_metrics
+from app.bootstrap import (
+    batch_metrics, bootstrap_metrics, moving_block_bootstrap_indices, stationary_bootstrap_indices
+)
+
+class TestBootstrap:
+    """Test cases for block-bootstrap confidence intervals."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        rng = np.random.default_rng(7)
+        dates = pd.date_range('2020-01-01', periods=600)
+        self.benchmark = pd.Series(rng.normal(0.0004, 0.01, 600), index=dates)
+        self.strategy = pd.Series(0.5 * self.benchmark.values + rng.normal(0.0002, 0.005, 600), index=dates)
+
+    def test_batch_metrics_match_calculate_metrics(self):
+        """Test the vectorized metrics against the scalar implementation."""
+        expected = calculate_metrics(self.strategy)
+        batched = batch_metrics(self.strategy.to_numpy()[None, :])
+
+        for metric, value in expected.items():
+            assert batched[metric][0] == pytest.approx(value)
+
+    def test_index_generators(self):
+        """Test shape and range of resample indices."""
+        rng = np.random.default_rng(0)
+        stationary = stationary_bootstrap_indices(100, 50, 5.0, rng)
+        block = moving_block_bootstrap_indices(100, 50, 7, rng)
+
+        for indices in (stationary, block):
+            assert indices.shape == (50, 100)
+            assert indices.min() >= 0 and indices.max() < 100
+        # Moving blocks are contiguous runs of the block length
+        assert np.all(np.diff(block[:, :7], axis=1) == 1)
+
+    def test_intervals_cover_point_estimate(self):
+        """Test interval structure for strategy, benchmark and difference."""
+        result = bootstrap_metrics(self.strategy, self.benchmark, n_resamples=1200, n_jobs=1)
+
+        for group in ("strategy", "benchmark", "difference"):
+            for summary in result[group].values():
+                assert summary["lower"] <= summary["upper"]
+                assert summary["std_error"] >= 0
+        sharpe = result["strategy"]["sharpe_ratio"]
+        assert sharpe["lower"] <= sharpe["point"] <= sharpe["upper"]
+        assert 0.0 <= result["prob_sharpe_outperform"] <= 1.0
+
+    def test_deterministic_across_workers(self):
+        """Test that results depend on the seed, not on the worker count."""
+        single = bootstrap_metrics(self.strategy, self.benchmark, n_resamples=1200, method="block", n_jobs=1)
+        parallel = bootstrap_metrics(self.strategy, self.benchmark, n_resamples=1200, method="block", n_jobs=2)
+
+        assert single["difference"] == parallel["difference"]
+
+    def test_invalid_method(self):
+        """Test rejection of unknown resampling methods."""
+        with pytest.raises(ValueError, match="method must be"):
+            bootstrap_metrics(self.strategy, self.benchmark, method="iid")
+
+    def test_invalid_sizes(self):
+        """Test rejection of non-positive resample counts and block lengths."""
+        with pytest.raises(ValueError, match="n_resamples must be positive"):
+            bootstrap_metrics(self.strategy, self.benchmark, n_resamples=0)
+        with pytest.raises(ValueError, match="block_length must be positive"):
+            bootstrap_metrics(self.strategy, self.benchmark, block_length=0)
+        with pytest.raises(ValueError, match="block_length must be positive"):
+            bootstrap_metrics(self.strategy, self.benchmark, method="block", block_length=-2)
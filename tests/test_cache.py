@@ -0,0 +1,155 @@
+import os
+import shutil
+import tempfile
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch, MagicMock
+import app.cache as cache_module
+from app.cache import FileTier, ObjectStoreTier, TieredCache, build_cache, set_cache
+from app.data_loader import get_latest_df, data_cache_key
+from app.model import RegimeHMM, model_cache_key
+
+class FakeS3Client:
+    """Dict-backed stand-in for the boto3 S3 client."""
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.exceptions.NoSuchKey(Key)
+        body = MagicMock()
+        body.read.return_value = self.objects[(Bucket, Key)]
+        return {'Body': body}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+
+class TestTieredCache:
+    """Test cases for the tiered data and model cache."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.shared_dir = tempfile.mkdtemp()
+        self.sample_df = pd.DataFrame({
+            'Close': np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, 300))) * 100
+        }, index=pd.date_range('2023-01-01', periods=300, name='Date'))
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        set_cache(None)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        shutil.rmtree(self.shared_dir, ignore_errors=True)
+
+    def make_cache(self):
+        return TieredCache([FileTier(self.tmp_dir), FileTier(self.shared_dir)])
+
+    def test_read_through_populates_upper_tiers(self):
+        """Test that a shared-tier hit is copied into /tmp and memory."""
+        FileTier(self.shared_dir).put('data/SPY.parquet', b'payload')
+        cache = self.make_cache()
+        assert cache.get('data/SPY.parquet') == b'payload'
+        assert FileTier(self.tmp_dir).get('data/SPY.parquet') == b'payload'
+        shutil.rmtree(self.shared_dir)
+        assert cache.get('data/SPY.parquet') == b'payload'
+
+    def test_put_writes_every_tier(self):
+        """Test write-back to all tiers and a miss on unknown keys."""
+        cache = self.make_cache()
+        cache.put('model/SPY/a.pkl', {'x': 1}, serialize=lambda v: repr(v).encode())
+        assert cache.get('model/SPY/a.pkl') == {'x': 1}
+        assert FileTier(self.shared_dir).get('model/SPY/a.pkl') == b"{'x': 1}"
+        assert cache.get('missing') is None
+
+    def test_file_tier_max_age(self):
+        """Test that stale /tmp entries are treated as misses."""
+        tier = FileTier(self.tmp_dir, max_age=60)
+        tier.put('k', b'v')
+        assert tier.get('k') == b'v'
+        old = os.path.getmtime(tier._path('k')) - 120
+        os.utime(tier._path('k'), (old, old))
+        assert tier.get('k') is None
+
+    def test_object_store_tier(self):
+        """Test the S3 tier against a stand-in client."""
+        client = FakeS3Client()
+        tier = ObjectStoreTier('bucket', prefix='p/', client=client)
+        assert tier.get('k') is None
+        tier.put('k', b'v')
+        assert client.objects[('bucket', 'p/k')] == b'v'
+        assert tier.get('k') == b'v'
+
+    def test_failing_tier_is_a_miss(self):
+        """Test that tier errors degrade to misses instead of raising."""
+        broken = MagicMock()
+        broken.get.side_effect = RuntimeError('unreachable')
+        broken.put.side_effect = RuntimeError('unreachable')
+        cache = TieredCache([broken, FileTier(self.shared_dir)])
+        cache.put('k', b'v')
+        cache.invalidate('k')
+        assert cache.get('k') == b'v'
+
+    def test_memory_tier_bounded(self):
+        """Test that the memory tier evicts least-recently-used keys and drops expired ones on read."""
+        cache = TieredCache([], memory_ttl=60, memory_size=2)
+        for key in ('a', 'b', 'c'):
+            cache.put(key, key)
+        assert cache.get('a') is None
+        assert len(cache._memory) == 2
+
+        with patch('app.cache.time.monotonic', return_value=cache._memory.get('c')[0] + 120):
+            assert cache.get('c') is None
+        assert cache._memory.get('c') is None
+
+    def test_build_cache(self):
+        """Test tier configuration parsing."""
+        assert build_cache('') is None
+        with patch.object(cache_module, 'CACHE_BUCKET', 'file://' + self.shared_dir):
+            cache = build_cache('memory,tmp,s3')
+        assert cache.memory and len(cache.tiers) == 2
+        with pytest.raises(ValueError):
+            build_cache('memory,redis')
+
+    @patch('app.data_loader.cache_data')
+    @patch('app.data_loader.fetch_ohlcv')
+    @patch('app.data_loader.load_cached_data')
+    def test_new_container_warms_from_shared_tier(self, mock_load, mock_fetch, mock_cache):
+        """Test that data and model written by one container are reused by a fresh one."""
+        mock_load.return_value = pd.DataFrame()
+        mock_fetch.return_value = self.sample_df
+        set_cache(self.make_cache())
+        df = get_latest_df(symbol='SPY')
+        model = RegimeHMM(n_states=2)
+        model.fit(df)
+        model.save_cached(model_cache_key('SPY', df, 2))
+        mock_fetch.assert_called_once()
+
+        # Fresh container: empty memory and /tmp, only the shared tier survives.
+        set_cache(TieredCache([FileTier(tempfile.mkdtemp(dir=self.tmp_dir)), FileTier(self.shared_dir)]))
+        warm_df = get_latest_df(symbol='SPY')
+        pd.testing.assert_frame_equal(warm_df, self.sample_df, check_freq=False)
+        mock_fetch.assert_called_once()
+
+        warm_model = RegimeHMM(n_states=2)
+        assert warm_model.load_cached(model_cache_key('SPY', warm_df, 2))
+        assert warm_model.version() == model.version()
+        assert not RegimeHMM().load_cached(data_cache_key('QQQ'))
+
+    @patch('app.data_loader.cache_data')
+    @patch('app.data_loader.fetch_ohlcv')
+    def test_empty_fetch_not_written_to_tiers(self, mock_fetch, mock_cache):
+        """Test that a failed fetch leaves the shared data entry alone."""
+        shared = FileTier(self.shared_dir)
+        shared.put(data_cache_key('SPY'), b'good')
+        mock_fetch.return_value = pd.DataFrame()
+        set_cache(self.make_cache())
+        get_latest_df(force_refresh=True, symbol='SPY')
+
+        assert shared.get(data_cache_key('SPY')) == b'good'
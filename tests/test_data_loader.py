@@ -1,8 +1,12 @@
 import pytest
 import pandas as pd
 import os
+import hashlib
+import threading
+import time
 from unittest.mock import patch, MagicMock
-from app.data_loader import fetch_ohlcv, cache_data, load_cached_data, get_latest_df
+from app.data_loader import fetch_ohlcv, cache_data, load_cached_data, get_latest_df, to_compact, read_manifest
+from app.data_loader import FILE_MODE
 
 class TestDataLoader:
     """Test cases for data_loader module."""
@@ -20,8 +24,10 @@ class TestDataLoader:
     
     def teardown_method(self):
         """Cleanup test environment."""
-        if os.path.exists(self.test_parquet_path):
-            os.remove(self.test_parquet_path)
+        for path in (self.test_parquet_path, self.test_parquet_path + '.manifest.json',
+                     self.test_parquet_path + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
     
     @patch('app.data_loader.yf.download')
     def test_fetch_ohlcv_success(self, mock_download):
@@ -102,4 +108,172 @@ class TestDataLoader:
         assert isinstance(result, pd.DataFrame)
         assert len(result) == 3
         mock_fetch.assert_called_once()
-        mock_cache.assert_called_once() 
\ No newline at end of file
+        mock_cache.assert_called_once() 
+
+    def test_to_compact(self):
+        """Test float columns are downcast and integers kept."""
+        df = self.sample_df.astype({'Close': float, 'Open': float})
+        result = to_compact(df)
+
+        assert result['Close'].dtype == 'float32'
+        assert result['Open'].dtype == 'float32'
+        assert result['Volume'].dtype == df['Volume'].dtype
+
+    def test_cache_data_compact(self):
+        """Test compact caching stores float32 columns."""
+        df = self.sample_df.astype({'Close': float})
+        cache_data(df, self.test_parquet_path, compact=True)
+        result = load_cached_data(self.test_parquet_path)
+
+        assert result['Close'].dtype == 'float32'
+
+    def test_cache_data_row_groups_and_dedup(self):
+        """Test write-time de-duplication and row-group layout."""
+        import pyarrow.parquet as pq
+        df = pd.DataFrame({'Close': range(600)}, index=pd.date_range('2020-01-01', periods=600, name='Date'))
+        duplicated = pd.concat([df, df.iloc[[10]].assign(Close=-1)])
+        cache_data(duplicated, self.test_parquet_path)
+
+        parquet_file = pq.ParquetFile(self.test_parquet_path)
+        assert parquet_file.metadata.num_row_groups == 3
+        assert parquet_file.schema_arrow.metadata[b'regime.deduplicated'] == b'1'
+        pd.testing.assert_frame_equal(load_cached_data(self.test_parquet_path), df, check_freq=False)
+
+    def test_load_cached_data_pushdown_matches_pandas(self):
+        """Test column, date-range and tail reads against in-memory selection."""
+        df = pd.DataFrame({'Close': range(600), 'Volume': range(600)},
+                          index=pd.date_range('2020-01-01', periods=600, name='Date'))
+        cache_data(df, self.test_parquet_path)
+
+        result = load_cached_data(self.test_parquet_path, columns=['Close'], start='2020-09-15', end='2021-02-01')
+        pd.testing.assert_frame_equal(result, df.loc['2020-09-15':'2021-02-01', ['Close']], check_freq=False)
+        result = load_cached_data(self.test_parquet_path, columns=['Close'], tail=300)
+        pd.testing.assert_frame_equal(result, df[['Close']].tail(300), check_freq=False)
+        assert load_cached_data(self.test_parquet_path, start='2030-01-01').empty
+
+    def test_load_cached_data_legacy_file_deduplicated(self):
+        """Test that files without the de-duplication flag are still de-duplicated on read."""
+        duplicated = pd.concat([self.sample_df, self.sample_df.iloc[[0]]])
+        duplicated.to_parquet(self.test_parquet_path)
+        result = load_cached_data(self.test_parquet_path, tail=2)
+
+        assert list(result.index) == list(self.sample_df.index[-2:])
+
+    def test_cache_data_writes_manifest(self):
+        """Test that each write replaces the file and bumps the version manifest."""
+        cache_data(self.sample_df, self.test_parquet_path)
+        cache_data(pd.concat([self.sample_df, self.sample_df.iloc[[-1]].shift(1, freq='D')]), self.test_parquet_path)
+        manifest = read_manifest(self.test_parquet_path)
+
+        assert manifest["generation"] == 2
+        assert manifest["rows"] == 4
+        assert manifest["version"] == '20230104_4'
+        with open(self.test_parquet_path, 'rb') as f:
+            assert hashlib.sha256(f.read()).hexdigest() == manifest["sha256"]
+        assert [name for name in os.listdir('.') if name.startswith('.' + self.test_parquet_path)] == []
+
+    def test_cache_data_file_mode(self):
+        """Test that replaced files get the umask mode, not mkstemp's 0600."""
+        cache_data(self.sample_df, self.test_parquet_path)
+
+        assert os.stat(self.test_parquet_path).st_mode & 0o777 == FILE_MODE
+        assert os.stat(self.test_parquet_path + '.manifest.json').st_mode & 0o777 == FILE_MODE
+
+    def test_concurrent_writers_get_distinct_generations(self):
+        """Test that concurrent cache writes each bump the manifest generation exactly once."""
+        def writer():
+            for _ in range(5):
+                cache_data(self.sample_df, self.test_parquet_path)
+
+        threads = [threading.Thread(target=writer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert read_manifest(self.test_parquet_path)["generation"] == 20
+
+    def test_load_cached_data_serves_snapshot(self):
+        """Test that reads see replaced files, and an unreadable file falls back to the last snapshot."""
+        cache_data(self.sample_df, self.test_parquet_path)
+        assert len(load_cached_data(self.test_parquet_path)) == 3
+        cache_data(self.sample_df.iloc[:2], self.test_parquet_path)
+        assert len(load_cached_data(self.test_parquet_path)) == 2
+
+        with open(self.test_parquet_path, 'wb') as f:
+            f.write(b'not parquet')
+        result = load_cached_data(self.test_parquet_path, columns=['Close'])
+        assert list(result['Close']) == [103, 104]
+
+    def test_concurrent_reads_during_refresh(self):
+        """Test that readers never see a partial file while another thread rewrites it."""
+        frames = [self.sample_df, self.sample_df.iloc[:2]]
+        cache_data(frames[0], self.test_parquet_path)
+        stop = threading.Event()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                cache_data(frames[i % 2], self.test_parquet_path)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            lengths = {len(load_cached_data(self.test_parquet_path)) for _ in range(200)}
+        finally:
+            stop.set()
+            thread.join()
+        assert lengths <= {2, 3}
+
+    @patch('app.data_loader.get_cache', return_value=None)
+    @patch('app.data_loader.fetch_ohlcv')
+    def test_concurrent_refreshes_coalesce(self, mock_fetch, mock_get_cache):
+        """Test that a refresher waiting on the lock reuses the file written by the first one."""
+        def slow_fetch(symbol):
+            time.sleep(0.3)
+            return self.sample_df
+        mock_fetch.side_effect = slow_fetch
+        results = []
+
+        with patch('app.data_loader.PARQUET_PATH', self.test_parquet_path):
+            threads = [threading.Thread(target=lambda: results.append(get_latest_df(force_refresh=True)))
+                       for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert mock_fetch.call_count == 1
+        assert [len(result) for result in results] == [3, 3]
+
+    @patch('app.data_loader.get_cache', return_value=None)
+    @patch('app.data_loader.fetch_ohlcv')
+    def test_empty_selection_does_not_refetch(self, mock_fetch, mock_get_cache):
+        """Test that a filtered read with no matching rows returns them empty instead of refetching."""
+        cache_data(self.sample_df, self.test_parquet_path)
+        with patch('app.data_loader.PARQUET_PATH', self.test_parquet_path):
+            result = get_latest_df(columns=['Close'], start='2099-01-01')
+            last = get_latest_df(columns=['Close'], tail=1)
+
+        assert result.empty and list(result.columns) == ['Close']
+        assert list(last.index) == [self.sample_df.index[-1]]
+        mock_fetch.assert_not_called()
+
+    @patch('app.data_loader.get_cache', return_value=None)
+    @patch('app.data_loader.fetch_ohlcv')
+    def test_failed_refresh_keeps_cache(self, mock_fetch, mock_get_cache):
+        """Test that an empty or failing fetch leaves a populated cache and its manifest untouched."""
+        cache_data(self.sample_df, self.test_parquet_path)
+        with open(self.test_parquet_path, 'rb') as f:
+            data = f.read()
+
+        with patch('app.data_loader.PARQUET_PATH', self.test_parquet_path):
+            for outcome in (pd.DataFrame(), RuntimeError('rate limited')):
+                mock_fetch.side_effect = [outcome]
+                result = get_latest_df(force_refresh=True)
+                assert list(result.index) == list(self.sample_df.index)
+
+        assert read_manifest(self.test_parquet_path)["generation"] == 1
+        with open(self.test_parquet_path, 'rb') as f:
+            assert f.read() == data
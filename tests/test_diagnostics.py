@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+import pandas as pd
+from app.diagnostics import Diagnostics
+from app.model import RegimeHMM
+
+class TestDiagnostics:
+    """Test cases for the diagnostics collector."""
+
+    def test_counts_and_bounded_samples(self):
+        """Test that every event is counted but only a few are kept."""
+        diagnostics = Diagnostics('test', max_samples=2, verbose=False)
+        for day in range(5):
+            diagnostics.record('invalid_window', 'skipping', day=day)
+        diagnostics.record('day_exception', 'boom', day=9)
+
+        summary = diagnostics.summary()
+        assert summary['total'] == 6
+        assert summary['counts'] == {'invalid_window': 5, 'day_exception': 1}
+        assert [s['day'] for s in summary['samples']['invalid_window']] == [0, 1]
+
+    def test_quiet_by_default(self, capsys):
+        """Test that events are not printed unless verbose."""
+        diagnostics = Diagnostics('test', verbose=False)
+        diagnostics.record('invalid_window', 'skipping')
+        assert capsys.readouterr().out == ''
+
+        diagnostics.log_summary()
+        assert 'invalid_window=1' in capsys.readouterr().out
+
+    def test_verbose_prints_each_event(self, capsys):
+        """Test opt-in per-event logging."""
+        diagnostics = Diagnostics('test', verbose=True)
+        diagnostics.record('invalid_window', 'skipping')
+        assert '[test] invalid_window: skipping' in capsys.readouterr().out
+
+    def test_model_records_fallbacks(self, capsys):
+        """Test that RegimeHMM reports skips through the collector."""
+        diagnostics = Diagnostics('test', verbose=False)
+        hmm = RegimeHMM(n_states=3, diagnostics=diagnostics)
+        df = pd.DataFrame({'Close': np.linspace(100, 110, 10)}, index=pd.date_range('2023-01-01', periods=10))
+        hmm.fit(df)
+        probs = hmm.predict_proba(df)
+
+        assert np.allclose(probs, 1/3)
+        assert diagnostics.counts['fit_insufficient_prices'] == 1
+        assert diagnostics.counts['predict_unfitted'] == 1
+        assert capsys.readouterr().out == ''
+
+    def test_standalone_model_logs_fallbacks(self, capsys):
+        """Test that a model without a collector still logs fit failures and fallbacks."""
+        hmm = RegimeHMM(n_states=3)
+        df = pd.DataFrame({'Close': np.linspace(100, 110, 10)}, index=pd.date_range('2023-01-01', periods=10))
+        hmm.fit(df)
+        hmm.predict_proba(df)
+
+        out = capsys.readouterr().out
+        assert '[HMM] fit_insufficient_prices' in out
+        assert '[HMM] predict_unfitted' in out
@@ -0,0 +1,51 @@
+import pytest
+import numpy as np
+import pandas as pd
+from app.execution import simulate_execution
+from app.backtest import calculate_returns
+
+class TestExecution:
+    """Test cases for the vectorized execution engine."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        rng = np.random.default_rng(1)
+        dates = pd.date_range('2023-01-01', periods=50)
+        self.df = pd.DataFrame({
+            'Close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 50)))
+        }, index=dates)
+        self.signals = pd.Series(rng.choice([-1, 0, 1], 50), index=dates)
+
+    def test_matches_shifted_signal_returns(self):
+        """Test zero-cost parity with signals.shift(1) * returns."""
+        result = simulate_execution(self.df, self.signals)
+        expected = (self.signals.shift(1) * calculate_returns(self.df)).fillna(0)
+
+        assert np.allclose(result["net_returns"]["strategy"], expected)
+        assert result["net_returns"]["strategy"].iloc[0] == 0.0
+
+    def test_costs_charged_on_turnover(self):
+        """Test turnover and cost accounting."""
+        targets = pd.Series([0.0, 1.0, 1.0, -0.5, -0.5], index=self.df.index[:5])
+        result = simulate_execution(self.df.iloc[:5], targets, cost_bps=10, slippage_bps=5)
+
+        turnover = result["turnover"]["strategy"].tolist()
+        assert turnover == pytest.approx([0.0, 0.0, 1.0, 0.0, 1.5])
+        assert result["costs"]["strategy"].sum() == pytest.approx(2.5 * 15 / 1e4)
+        net = result["gross_returns"]["strategy"] - result["costs"]["strategy"]
+        assert np.allclose(result["net_returns"]["strategy"], net)
+
+    def test_many_columns_and_leverage_cap(self):
+        """Test several strategies in one pass with exposure clipping."""
+        targets = pd.DataFrame({
+            "long": 1.0,
+            "levered": 3.0,
+            "fractional": 0.25,
+        }, index=self.df.index)
+        result = simulate_execution(self.df, targets, max_leverage=2.0)
+
+        assert list(result["equity"].columns) == ["long", "levered", "fractional"]
+        assert result["positions"]["levered"].max() == 2.0
+        assert np.allclose(result["gross_returns"]["fractional"], 0.25 * result["gross_returns"]["long"])
+        assert np.allclose(result["equity"]["long"].iloc[-1],
+                           self.df['Close'].iloc[-1] / self.df['Close'].iloc[0])
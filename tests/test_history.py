@@ -0,0 +1,89 @@
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+import app.api as api
+from app.history import compress_segments, page_timeline, regime_timeline
+
+class TestRegimeHistory:
+    """Test cases for the decoded regime timeline."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.sample_df = pd.DataFrame({
+            'Close': np.linspace(100, 200, 11)
+        }, index=pd.date_range('2024-01-01', periods=11))
+        states = np.array([0, 0, 0, 1, 1, 2, 2, 2, 2, 0])
+        probs = np.eye(3)[states] * 0.7 + 0.1
+        self.model = MagicMock()
+        self.model.decode.return_value = (self.sample_df.index[1:], states, probs)
+        self.model.version.return_value = 'v1'
+        api.response_cache.clear()
+        api.history_cache.clear()
+        self.client = TestClient(api.app)
+
+    def test_compress_segments(self):
+        """Test run-length compression of a state path."""
+        dates = ['d0', 'd1', 'd2', 'd3']
+        segments = compress_segments(dates, np.array([2, 2, 0, 0]))
+        assert segments == [
+            {"start": 'd0', "end": 'd1', "state": 2, "label": "sideways", "days": 2},
+            {"start": 'd2', "end": 'd3', "state": 0, "label": "bull", "days": 2},
+        ]
+        assert compress_segments([], np.array([])) == []
+
+    def test_page_clips_segments(self):
+        """Test date filtering, clipping of boundary segments and the next cursor."""
+        timeline = regime_timeline(self.sample_df, self.model)
+        assert len(timeline["segments"]) == 4
+        page = page_timeline(timeline, start='2024-01-04', end='2024-01-10', limit=3)
+        assert [p["date"] for p in page["points"]] == ['2024-01-04', '2024-01-05', '2024-01-06']
+        assert page["segments"][0] == {"start": '2024-01-04', "end": '2024-01-04',
+                                       "state": 0, "label": "bull", "days": 1}
+        assert page["segments"][-1]["days"] == 2
+        assert page["next_cursor"] == '2024-01-07'
+        last = page_timeline(timeline, end='2024-01-10', cursor=page["next_cursor"], limit=3)
+        assert [p["date"] for p in last["points"]] == ['2024-01-07', '2024-01-08', '2024-01-09']
+        assert page_timeline(timeline, cursor='2024-01-10', end='2024-01-10')["next_cursor"] is None
+
+    @patch('app.api.model_labels', return_value=['bear', 'bull'])
+    @patch('app.api.get_latest_df')
+    @patch('app.api.get_or_create_model')
+    def test_endpoint_uses_model_labels(self, mock_get_model, mock_get_df, mock_labels):
+        """Test that a 2-state model's labels follow its mean-return order, as in /regime/latest."""
+        states = np.array([0, 0, 1, 1, 1, 0, 0, 0, 1, 1])
+        self.model.decode.return_value = (self.sample_df.index[1:], states, np.eye(2)[states])
+        mock_get_model.return_value = self.model
+        mock_get_df.return_value = self.sample_df
+        data = self.client.get('/regime/history', params={'limit': 3}).json()
+
+        assert [p["label"] for p in data["points"]] == ['bear', 'bear', 'bull']
+        assert [s["label"] for s in data["segments"]] == ['bear', 'bull']
+        mock_labels.assert_called_with(self.model)
+
+    @patch('app.api.get_latest_df')
+    @patch('app.api.get_or_create_model')
+    def test_endpoint_paginates_and_caches_decode(self, mock_get_model, mock_get_df):
+        """Test walking all pages with one decode per data and model version."""
+        mock_get_model.return_value = self.model
+        mock_get_df.return_value = self.sample_df
+        dates, cursor = [], None
+        while True:
+            params = {'limit': 4}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get('/regime/history', params=params)
+            assert response.status_code == 200
+            data = response.json()
+            dates += [p["date"] for p in data["points"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        assert len(dates) == 10 and len(set(dates)) == 10
+        assert self.model.decode.call_count == 1
+
+    def test_endpoint_rejects_bad_dates(self):
+        """Test that unparseable dates are a client error."""
+        response = self.client.get('/regime/history', params={'start': 'not-a-date'})
+        assert response.status_code == 400
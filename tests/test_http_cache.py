@@ -0,0 +1,104 @@
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+import app.api as api
+from app.http_cache import ResponseCache, make_etag, http_date
+
+class TestHttpCache:
+    """Test cases for conditional HTTP caching."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.sample_df = pd.DataFrame({
+            'Close': np.linspace(100, 200, 300)
+        }, index=pd.date_range('2023-01-01', periods=300))
+        self.model = MagicMock()
+        self.model.predict_proba.return_value = np.array([0.6, 0.2, 0.2])
+        self.model.version.return_value = 'v1'
+        api.response_cache.clear()
+        self.client = TestClient(api.app)
+
+    def test_make_etag_depends_on_versions(self):
+        """Test that the ETag changes with the data version."""
+        etag = make_etag("regime", "SPY", "2024-01-02", "v1")
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag == make_etag("regime", "SPY", "2024-01-02", "v1")
+        assert etag != make_etag("regime", "SPY", "2024-01-03", "v1")
+
+    def test_http_date(self):
+        """Test HTTP date formatting of bar timestamps."""
+        assert http_date(pd.Timestamp('2024-01-02')) == 'Tue, 02 Jan 2024 00:00:00 GMT'
+
+    def test_response_cache_evicts_lru(self):
+        """Test bounded LRU eviction."""
+        cache = ResponseCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert len(cache) == 2
+
+    def test_regime_etag_and_304(self):
+        """Test that a matching If-None-Match skips the model entirely."""
+        with patch.object(api, 'get_latest_df', return_value=self.sample_df), \
+             patch.object(api, 'get_or_create_model', return_value=self.model), \
+             patch.object(api, 'get_snapshot', return_value=None):
+            first = self.client.get('/regime/latest')
+            assert first.status_code == 200
+            assert 'max-age' in first.headers['cache-control']
+            assert first.headers['last-modified'] == http_date(self.sample_df.index[-1])
+            etag = first.headers['etag']
+
+            second = self.client.get('/regime/latest', headers={'If-None-Match': etag})
+            assert second.status_code == 304
+            assert second.headers['etag'] == etag
+
+        # Only the first request ran inference
+        assert self.model.predict_proba.call_count == 1
+
+    def test_regime_served_from_response_cache(self):
+        """Test that unconditional repeats are answered from the in-process cache."""
+        with patch.object(api, 'get_latest_df', return_value=self.sample_df), \
+             patch.object(api, 'get_or_create_model', return_value=self.model), \
+             patch.object(api, 'get_snapshot', return_value=None):
+            first = self.client.get('/regime/latest')
+            second = self.client.get('/regime/latest')
+
+        assert first.json() == second.json()
+        assert self.model.predict_proba.call_count == 1
+
+    def test_cold_worker_304_without_model(self):
+        """Test that a matching If-None-Match is answered from the last bar before any model is loaded."""
+        with patch.object(api, 'get_latest_df', return_value=self.sample_df), \
+             patch.object(api, 'get_or_create_model', return_value=self.model), \
+             patch.object(api, 'get_snapshot', return_value=None):
+            etag = self.client.get('/regime/latest').headers['etag']
+
+        with patch.object(api, 'get_latest_df', return_value=self.sample_df.tail(1)) as mock_df, \
+             patch.object(api, 'get_or_create_model') as mock_model, \
+             patch.object(api, 'get_snapshot', return_value=None):
+            response = self.client.get('/regime/latest', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        mock_model.assert_not_called()
+        mock_df.assert_called_once_with(symbol='SPY', columns=['Close'], tail=1)
+
+    def test_refit_on_same_bar_invalidates(self):
+        """Test that a new model version on the same bar is served despite If-Modified-Since."""
+        with patch.object(api, 'get_latest_df', return_value=self.sample_df), \
+             patch.object(api, 'get_or_create_model', return_value=self.model), \
+             patch.object(api, 'get_snapshot', return_value=None):
+            first = self.client.get('/regime/latest')
+            self.model.version.return_value = 'v2'
+            with patch.object(api, 'hmm_model', self.model):
+                by_etag = self.client.get('/regime/latest', headers={'If-None-Match': first.headers['etag']})
+            by_date = self.client.get('/regime/latest', headers={'If-Modified-Since': first.headers['last-modified']})
+
+        assert by_etag.status_code == 200
+        assert by_date.status_code == 200
+        assert by_etag.headers['etag'] != first.headers['etag']
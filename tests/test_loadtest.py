@@ -0,0 +1,86 @@
+import pytest
+import argparse
+import asyncio
+import os
+import shutil
+from unittest.mock import patch
+import app.data_loader as data_loader
+import app.api as api
+from app.cache import TieredCache, set_cache
+from app.loadtest import compare, prepare_fixture, reset_app_state, run_inprocess, summarize
+
+class TestLoadTest:
+    """Test cases for the API load-test harness."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.test_dir = '/tmp/test_loadtest_fixture'
+
+    def teardown_method(self):
+        """Cleanup test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        reset_app_state()
+
+    def test_summarize_percentiles(self):
+        """Test per-endpoint statistics."""
+        samples = [('/a', float(ms), 200) for ms in range(1, 101)] + [('/a', 5.0, 500), ('/b', 2.0, 304)]
+        report = summarize(samples, duration=2.0, cold_start={'/a': 50.0})
+
+        assert report['/a']['requests'] == 101
+        assert report['/a']['errors'] == 1
+        assert report['/a']['throughput_rps'] == pytest.approx(50.5)
+        assert report['/a']['p50_ms'] == pytest.approx(50.0)
+        assert report['/a']['p99_ms'] > report['/a']['p95_ms']
+        assert report['/b']['not_modified'] == 1
+        assert report['/b']['cold_start_ms'] is None
+
+    def test_compare_flags_regressions(self):
+        """Test regression detection against a baseline."""
+        baseline = {"endpoints": {"/a": {"p95_ms": 10.0, "throughput_rps": 100.0}}}
+        current = {"endpoints": {"/a": {"p95_ms": 15.0, "throughput_rps": 70.0}}}
+
+        assert len(compare(current, baseline, max_regression=0.2)) == 2
+        assert compare(baseline, baseline, max_regression=0.2) == []
+
+    def test_run_inprocess(self):
+        """Test a short in-process run against the synthetic fixture."""
+        args = argparse.Namespace(
+            fixture_dir=self.test_dir, days=300, endpoints=['/regime/latest', '/signal/latest'],
+            concurrency=2, duration=0.5, conditional=True
+        )
+        original_path = data_loader.PARQUET_PATH
+        with patch('app.api.get_snapshot', return_value=None):
+            report = asyncio.run(run_inprocess(args))
+
+        assert data_loader.PARQUET_PATH == original_path
+
+        for endpoint in args.endpoints:
+            assert report[endpoint]['requests'] > 0
+            assert report[endpoint]['errors'] == 0
+            assert report[endpoint]['cold_start_ms'] > 0
+
+    def test_prepare_fixture_restores_path(self):
+        """Test that the fixture path is restored and a temporary fixture removed on exit."""
+        original_path = data_loader.PARQUET_PATH
+        with prepare_fixture(n_days=50) as directory:
+            assert data_loader.PARQUET_PATH == os.path.join(directory, os.path.basename(original_path))
+            assert os.path.exists(data_loader.PARQUET_PATH)
+
+        assert data_loader.PARQUET_PATH == original_path
+        assert not os.path.exists(directory)
+
+    def test_reset_app_state_clears_data_caches(self):
+        """Test that a reset drops loaded data snapshots, memory-cached frames and history timelines."""
+        cache = TieredCache([])
+        set_cache(cache)
+        try:
+            cache.put('data/SPY', 'frame')
+            data_loader._snapshots['x.parquet'] = ((1, 2, 3), None)
+            api.history_cache.put('key', 'timeline')
+            reset_app_state()
+
+            assert cache.get('data/SPY') is None
+            assert data_loader._snapshots == {}
+            assert api.history_cache.get('key') is None
+        finally:
+            set_cache(None)
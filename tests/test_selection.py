@@ -0,0 +1,61 @@
+import pytest
+import numpy as np
+from unittest.mock import patch
+import app.selection as selection
+from app.model import label_states
+from app.refresh import compute_snapshot
+from app.selection import fit_selected_model, select_model_order
+from app.synthetic import generate_ohlcv
+
+class TestModelSelection:
+    """Test cases for model-order selection."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.df = generate_ohlcv(400, seed=3)
+        selection._selection_cache.clear()
+
+    def test_label_states_by_mean(self):
+        """Test naming states by mean return for any state count."""
+        assert label_states(np.array([0.001, -0.002])) == ['bull', 'bear']
+        assert label_states(np.array([0.0, 0.002, -0.001, 0.001])) == ['sideways', 'bull', 'bear', 'sideways']
+
+    def test_selects_best_by_criterion(self):
+        """Test that the winner optimizes the requested criterion."""
+        result = select_model_order(self.df, state_counts=(2, 3), covariance_types=('full', 'tied'), n_jobs=1)
+        scored = [c for c in result["candidates"] if "error" not in c]
+        assert len(result["candidates"]) == 4
+        assert result["best"]["bic"] == min(c["bic"] for c in scored)
+        by_test = select_model_order(self.df, state_counts=(2, 3), covariance_types=('full',),
+                                     criterion='test_log_likelihood', n_jobs=1)
+        assert by_test["best"]["test_log_likelihood"] == max(
+            c["test_log_likelihood"] for c in by_test["candidates"] if "error" not in c)
+        with pytest.raises(ValueError):
+            select_model_order(self.df, criterion='r2')
+
+    def test_parallel_matches_serial(self):
+        """Test that process-parallel scoring gives the same result."""
+        kwargs = dict(state_counts=(2, 3), covariance_types=('full', 'tied'))
+        assert select_model_order(self.df, n_jobs=2, **kwargs) == select_model_order(self.df, n_jobs=1, **kwargs)
+
+    def test_cached_per_symbol_and_data_version(self):
+        """Test that a repeat selection on the same data does not refit."""
+        kwargs = dict(state_counts=(2,), covariance_types=('full',), n_jobs=1)
+        first = select_model_order(self.df, symbol='SPY', **kwargs)
+        with patch('app.selection.score_candidate') as mock_score:
+            assert select_model_order(self.df, symbol='SPY', **kwargs) == first
+            mock_score.assert_not_called()
+        with patch('app.selection.score_candidate', wraps=selection.score_candidate) as mock_score:
+            select_model_order(self.df.iloc[:-1], symbol='SPY', **kwargs)
+            mock_score.assert_called_once()
+
+    def test_snapshot_with_selected_state_count(self):
+        """Test that a non-3-state model maps onto bull/bear/sideways signals."""
+        model = fit_selected_model(self.df, state_counts=(2,), covariance_types=('full',), n_jobs=1)
+        assert model.n_states == 2
+        with patch.object(selection, 'MODEL_SELECTION', True):
+            snapshot = compute_snapshot('SPY', self.df, model)
+        assert sorted(snapshot["state_labels"]) == ['bear', 'bull']
+        assert len(snapshot["regime_probs"]) == 3
+        assert snapshot["regime_probs"][2] == 0.0
+        assert sum(snapshot["regime_probs"]) == pytest.approx(1.0)
@@ -0,0 +1,115 @@
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sqlite3
+from unittest.mock import patch, MagicMock
+from app.snapshots import SnapshotStore, SQLiteSnapshotStore, get_snapshot_store
+from app.refresh import compute_snapshot, refresh_snapshots
+
+class TestSnapshots:
+    """Test cases for snapshot stores and the refresh job."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.test_db_path = '/tmp/test_snapshots.db'
+        self.store = SQLiteSnapshotStore(self.test_db_path)
+        self.sample_df = pd.DataFrame({
+            'Close': np.linspace(100, 200, 300)
+        }, index=pd.date_range('2023-01-01', periods=300))
+
+    def teardown_method(self):
+        """Cleanup test environment."""
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+    def test_sqlite_put_get(self):
+        """Test storing and reading back a snapshot."""
+        item = {"symbol": "SPY", "timestamp": "2024-01-02 00:00:00", "regime_probs": [0.5, 0.25, 0.25]}
+        self.store.put_item(item)
+
+        assert self.store.get_item("SPY") == item
+        assert self.store.get_item("QQQ") is None
+
+    def test_sqlite_overwrites_latest(self):
+        """Test that a newer snapshot replaces the previous one."""
+        self.store.put_item({"symbol": "SPY", "timestamp": "2024-01-02 00:00:00"})
+        self.store.put_item({"symbol": "SPY", "timestamp": "2024-01-03 00:00:00"})
+
+        assert self.store.get_item("SPY")["timestamp"] == "2024-01-03 00:00:00"
+
+    def test_sqlite_batch_get(self):
+        """Test fetching several symbols in one query."""
+        self.store.put_item({"symbol": "SPY", "timestamp": "t"})
+        self.store.put_item({"symbol": "QQQ", "timestamp": "t"})
+
+        items = self.store.batch_get_items(["SPY", "QQQ", "IWM"])
+        assert set(items) == {"SPY", "QQQ"}
+
+    def test_sqlite_closes_connections(self):
+        """Test that every operation commits and closes its connection."""
+        connections = []
+        connect = sqlite3.connect
+
+        def tracking_connect(*args, **kwargs):
+            connections.append(connect(*args, **kwargs))
+            return connections[-1]
+
+        with patch('app.snapshots.sqlite3.connect', side_effect=tracking_connect):
+            self.store.put_item({"symbol": "SPY", "timestamp": "t"})
+            self.store.batch_get_items(["SPY"])
+
+        assert SQLiteSnapshotStore(self.test_db_path).get_item("SPY") == {"symbol": "SPY", "timestamp": "t"}
+        assert len(connections) == 2
+        for conn in connections:
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute('SELECT 1')
+
+    def test_snapshot_store_is_abstract(self):
+        """Test that a backend must implement put_item and get_item."""
+        class Partial(SnapshotStore):
+            def get_item(self, symbol):
+                return None
+
+        with pytest.raises(TypeError):
+            SnapshotStore()
+        with pytest.raises(TypeError):
+            Partial()
+
+    def test_get_snapshot_store_disabled(self):
+        """Test that no store is built when snapshots are disabled."""
+        assert get_snapshot_store('') is None
+        with pytest.raises(ValueError, match="Unknown snapshot store"):
+            get_snapshot_store('redis')
+
+    def test_compute_snapshot(self):
+        """Test snapshot contents from a model."""
+        model = MagicMock()
+        model.predict_proba.return_value = np.array([0.8, 0.1, 0.1])
+        model.version.return_value = 'abc123'
+        snapshot = compute_snapshot("SPY", self.sample_df, model)
+
+        assert snapshot["symbol"] == "SPY"
+        assert snapshot["timestamp"] == str(self.sample_df.index[-1])
+        assert snapshot["regime_probs"] == [0.8, 0.1, 0.1]
+        assert snapshot["signal"]["action"] == "BUY"
+        assert snapshot["model_version"] == 'abc123'
+
+    @patch('app.refresh.get_latest_df')
+    def test_refresh_snapshots_isolates_errors(self, mock_get_df):
+        """Test that one failing symbol does not block the others."""
+        def fake_get_df(force_refresh=False, symbol='SPY'):
+            if symbol == 'BAD':
+                return pd.DataFrame()
+            return self.sample_df
+        mock_get_df.side_effect = fake_get_df
+
+        with patch('app.refresh.RegimeHMM') as mock_hmm:
+            mock_hmm.return_value.model = None
+            mock_hmm.return_value.predict_proba.return_value = np.array([1/3, 1/3, 1/3])
+            mock_hmm.return_value.version.return_value = 'unfitted'
+            result = refresh_snapshots(["SPY", "BAD"], store=self.store)
+
+        assert "SPY" in result["updated"]
+        assert "BAD" in result["errors"]
+        assert self.store.get_item("SPY") is not None
@@ -1,9 +1,10 @@
+import json
 import pytest
 import numpy as np
 import pandas as pd
 from app.strategies import (
     calculate_ma_crossover, calculate_rsi, bull_strategy, 
-    bear_strategy, sideways_strategy, generate_signal
+    bear_strategy, sideways_strategy, generate_signal, IndicatorState
 )
 
 class TestStrategies:
@@ -125,4 +126,61 @@ class TestStrategies:
         # All ones (normalized)
         regime_probs = np.array([1.0, 0.0, 0.0])
         signal_data = generate_signal(regime_probs, self.bull_df)
-        assert signal_data["action"] in ["BUY", "SELL", "HOLD"] 
\ No newline at end of file
+        assert signal_data["action"] in ["BUY", "SELL", "HOLD"] 
+
+    def test_generate_signal_with_labels(self):
+        """Test mapping any number of labelled states onto the three strategies."""
+        bull_df = pd.DataFrame({'Close': np.linspace(100, 200, 300)}, index=pd.date_range('2023-01-01', periods=300))
+        two_state = generate_signal(np.array([0.9, 0.1]), bull_df, labels=['bull', 'bear'])
+        assert two_state["regime_probs"] == [0.9, 0.1, 0.0]
+        assert two_state["action"] == "BUY"
+        four_state = generate_signal(np.array([0.1, 0.2, 0.3, 0.4]), bull_df,
+                                     labels=['sideways', 'bull', 'bear', 'sideways'])
+        assert four_state["regime_probs"] == pytest.approx([0.2, 0.3, 0.5])
+        with pytest.raises(ValueError):
+            generate_signal(np.array([0.5, 0.5]), bull_df, labels=['bull'])
+
+
+class TestIndicatorState:
+    """Test cases for streaming indicator state."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        rng = np.random.default_rng(7)
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+        closes[150] = np.nan
+        self.df = pd.DataFrame({'Close': closes}, index=pd.date_range('2023-01-01', periods=400))
+
+    def test_matches_rolling_indicators_bar_by_bar(self):
+        """Test that incremental MA crossover and RSI equal the rolling versions on every bar."""
+        state = IndicatorState()
+        for i, (timestamp, close) in enumerate(self.df['Close'].items()):
+            state.update(close, timestamp)
+            window = self.df.iloc[:i + 1].tail(200)
+            assert state.ma.value == calculate_ma_crossover(window, 50, 200)
+            assert state.rsi.value == pytest.approx(calculate_rsi(window, 14), abs=1e-9)
+
+    def test_signal_matches_generate_signal(self):
+        """Test that the streaming signal equals generate_signal on the last 200 bars."""
+        regime_probs = np.array([0.5, 0.3, 0.2])
+        state = IndicatorState.from_df(self.df)
+        assert state.signal(regime_probs) == generate_signal(regime_probs, self.df.tail(200))
+        with pytest.raises(ValueError):
+            state.signal(np.array([0.5, 0.5]))
+
+    def test_json_round_trip_and_catch_up(self):
+        """Test resuming from serialized state and applying only new bars."""
+        state = IndicatorState.from_df(self.df.iloc[:300])
+        restored = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+        assert restored.follows(self.df)
+        assert restored.catch_up(self.df) == 100
+        full = IndicatorState.from_df(self.df)
+        assert restored.ma.value == full.ma.value
+        assert restored.rsi.value == pytest.approx(full.rsi.value, abs=1e-9)
+
+    def test_rewritten_history_is_not_followed(self):
+        """Test that adjusted (rescaled) history forces a rebuild."""
+        state = IndicatorState.from_df(self.df)
+        adjusted = self.df * 0.99
+        assert not state.follows(adjusted)
+        assert not IndicatorState().follows(self.df)
@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import shutil
+from unittest.mock import patch
+from app.data_loader import load_cached_data
+from app.model import RegimeHMM
+from app.synthetic import (
+    DEFAULT_REGIME_PARAMS, generate_ohlcv, generate_universe, regime_params_from_model, write_universe
+)
+
+class TestSynthetic:
+    """Test cases for the synthetic market generator."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.test_dir = '/tmp/test_synthetic_cache'
+
+    def teardown_method(self):
+        """Cleanup test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_generate_ohlcv_shape(self):
+        """Test frame layout matches fetch_ohlcv output."""
+        df = generate_ohlcv(1000, seed=1)
+
+        assert list(df.columns) == ['Close', 'High', 'Low', 'Open', 'Volume']
+        assert df.index.name == 'Date'
+        assert len(df) == 1000 and df.index.is_unique
+        assert (df['High'] >= df[['Open', 'Close']].max(axis=1)).all()
+        assert (df['Low'] <= df[['Open', 'Close']].min(axis=1)).all()
+        assert df['Volume'].dtype == np.int64
+
+    def test_seed_is_reproducible(self):
+        """Test fixed seeds give identical frames."""
+        pd.testing.assert_frame_equal(generate_ohlcv(300, seed=5), generate_ohlcv(300, seed=5))
+        assert not generate_ohlcv(300, seed=5).equals(generate_ohlcv(300, seed=6))
+
+    def test_regime_statistics(self):
+        """Test sampled returns follow the regime parameters."""
+        df, states = generate_ohlcv(20000, seed=2, return_states=True)
+        log_returns = np.diff(np.log(df['Close'].to_numpy()))
+        bear = states[1:] == 1
+
+        assert set(np.unique(states)) == {0, 1, 2}
+        assert log_returns[bear].std() == pytest.approx(DEFAULT_REGIME_PARAMS["stds"][1], rel=0.1)
+
+    def test_params_from_fitted_model(self):
+        """Test sampling from a fitted RegimeHMM."""
+        hmm = RegimeHMM(n_states=3)
+        hmm.fit(generate_ohlcv(600, seed=3))
+        params = regime_params_from_model(hmm)
+
+        assert params["transmat"].shape == (3, 3)
+        assert np.allclose(params["transmat"].sum(axis=1), 1.0)
+        assert len(generate_ohlcv(200, model=hmm, seed=4)) == 200
+
+    def test_write_universe_round_trip(self):
+        """Test frames land in the data_loader cache layout."""
+        frames = generate_universe(['SPY', 'QQQ'], 250, seed=9)
+        paths = write_universe(frames, self.test_dir)
+
+        assert os.path.basename(paths['QQQ']) == 'data_cache_QQQ.parquet'
+        loaded = load_cached_data(paths['QQQ'])
+        pd.testing.assert_frame_equal(loaded, frames['QQQ'], check_freq=False)
+
+    def test_write_universe_refuses_live_cache(self):
+        """Test that synthetic frames only replace the live cache when explicitly allowed."""
+        frames = generate_universe(['SPY'], 50, seed=9)
+        os.makedirs(self.test_dir)
+        with patch('app.data_loader.PARQUET_PATH', os.path.join(self.test_dir, 'data_cache.parquet')):
+            for directory in (None, self.test_dir + '/'):
+                with pytest.raises(ValueError, match="live cache"):
+                    write_universe(frames, directory)
+            assert not os.path.exists(os.path.join(self.test_dir, 'data_cache.parquet'))
+
+            paths = write_universe(frames, overwrite_live=True)
+        assert paths['SPY'] == os.path.join(self.test_dir, 'data_cache.parquet')